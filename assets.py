@@ -0,0 +1,66 @@
+import pygame
+
+
+class AssetBank:
+    """
+    Process-wide store for sounds, fonts and baked surfaces. Each asset is
+    loaded or baked once per distinct set of parameters and then shared.
+    With a RenderCache attached as disk, baked surfaces and sample buffers
+    also come from, and go to, the previous run's cache file.
+    """
+
+    def __init__(self):
+        self._sounds = {}
+        self._fonts = {}
+        self._font_keys = {}  # font -> (path, size), so glyphs can be keyed by file
+        self._surfaces = {}
+        self.disk = None
+
+    def sound(self, path):
+        snd = self._sounds.get(path)
+        if snd is None:
+            snd = self._sounds[path] = pygame.mixer.Sound(path)
+        return snd
+
+    def font(self, path, size):
+        key = (path, size)
+        font = self._fonts.get(key)
+        if font is None:
+            font = self._fonts[key] = pygame.font.Font(path, size)
+            self._font_keys[font] = key
+        return font
+
+    def font_key(self, font):
+        """ (path, size) of a font loaded here, None for fonts from elsewhere. """
+        return self._font_keys.get(font)
+
+    def surface(self, key, bake):
+        """ Returns the surface cached under key, calling bake() to build it the first time. """
+        surf = self._surfaces.get(key)
+        if surf is None:
+            surf = self._surfaces[key] = bake() if self.disk is None else self.disk.surface(key, bake)
+        return surf
+
+    def pcm(self, key, bake):
+        """ Raw samples cached under key, calling bake() for an array of them the first time. Not kept in memory. """
+        if self.disk is None:
+            return bake()
+        return self.disk.pcm(key, bake)
+
+    def clear(self):
+        self._sounds.clear()
+        self._fonts.clear()
+        self._font_keys.clear()
+        self._surfaces.clear()
+
+    def stats(self):
+        surface_bytes = sum(s.get_pitch() * s.get_height() for s in self._surfaces.values())
+        return {
+            "sounds": len(self._sounds),
+            "fonts": len(self._fonts),
+            "surfaces": len(self._surfaces),
+            "surface_bytes": surface_bytes,
+        }
+
+
+ASSETS = AssetBank()
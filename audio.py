@@ -0,0 +1,184 @@
+import hashlib
+import os
+import random
+
+import numpy as np
+import pygame
+
+from assets import ASSETS
+from constants import *
+
+_CLICK_BANK_VERSION = 1
+
+
+def synthesize_click_bank(freq, channels, variants=CLICK_VARIANTS, seed=0):
+    """
+    Generate `variants` short mechanical clicks as int16 samples shaped
+    (variants, length, channels). Each one gets its own pitch, decay and pan:
+    a noise transient for the impact, a few damped resonances for the flap
+    body and a quieter second hit as the flap settles.
+    """
+    rng = np.random.default_rng(seed)
+    length = int(0.045 * freq)
+    t = np.arange(length, dtype=np.float64) / freq
+    bank = np.zeros((variants, length, channels), dtype=np.int16)
+
+    for i in range(variants):
+        pitch = rng.uniform(0.88, 1.12)
+        decay = rng.uniform(0.004, 0.009)
+        pan = rng.uniform(-0.35, 0.35)
+
+        impact = rng.standard_normal(length) * np.exp(-t / 0.0007)
+        body = np.zeros(length)
+        for base_hz, amp in ((1900.0, 1.0), (3300.0, 0.55), (5100.0, 0.3)):
+            phase = rng.uniform(0, 2 * np.pi)
+            body += amp * np.sin(2 * np.pi * base_hz * pitch * t + phase)
+        body *= np.exp(-t / decay)
+        hit = 0.6 * impact + body
+
+        # Settle: a softer copy of the hit a few milliseconds later
+        settle = int(rng.uniform(0.006, 0.011) * freq)
+        hit[settle:] += rng.uniform(0.25, 0.45) * hit[:length - settle]
+
+        hit *= 0.85 / np.max(np.abs(hit))
+        if channels == 1:
+            gains = (1.0,)
+        else:
+            # Equal-power pan across the first two channels
+            angle = (pan + 1.0) * np.pi / 4.0
+            gains = (np.cos(angle), np.sin(angle)) + (np.sqrt(0.5),) * (channels - 2)
+        for ch, gain in enumerate(gains):
+            bank[i, :, ch] = (hit * gain * 32767.0).astype(np.int16)
+    return bank
+
+
+def load_click_bank(freq, channels, variants=CLICK_VARIANTS, seed=0, cache_dir=CACHE_DIR):
+    """ Same as synthesize_click_bank, but reuses a cached .npy for identical parameters. """
+    params = f"{_CLICK_BANK_VERSION}-{freq}-{channels}-{variants}-{seed}"
+    digest = hashlib.sha1(params.encode()).hexdigest()[:12]
+    path = os.path.join(cache_dir, f"clicks-{digest}.npy") if cache_dir else None
+    if path and os.path.exists(path):
+        try:
+            return np.load(path)
+        except (OSError, ValueError) as exc:
+            print(f"Ignoring unreadable click cache {path}: {exc}")
+
+    bank = synthesize_click_bank(freq, channels, variants, seed)
+    if path:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            np.save(path, bank)
+        except OSError as exc:
+            print(f"Could not write click cache {path}: {exc}")
+    return bank
+
+
+class ClickMixer:
+    """
+    Collects flap click events during a frame and plays a single pre-mixed
+    cluster sound for all of them at the end of it. Clusters are synthesized
+    once per size bucket, so audio cost stays flat however many flaps move.
+    """
+
+    # Cluster sizes that get their own buffers; larger counts use the last one
+    BUCKETS = (1, 2, 3, 4, 6, 8, 12, 16, 24, 32, 48, 64)
+    ALTERNATIVES = 3        # differently mixed buffers per bucket, picked at random
+    PLAY_PROBABILITY = 0.5  # a flap audibly clicks on about half its steps
+
+    def __init__(self, synth=CLICK_SYNTH, sound_path=CLICK_SOUND, volume=CLICK_VOLUME,
+                 spread=1.0 / FPS, seed=0):
+        self.synth = synth
+        self.sound_path = sound_path
+        self.volume = volume
+        self.spread = spread  # seconds the clicks of one cluster are scattered over
+        self.seed = seed
+        self.pending = 0
+        self.plays = 0
+        self.ready = False  # set by warm() once the mixer is up; clicks before that are dropped
+        self._rng = None    # created on first synthesis, which a warm render cache skips entirely
+        self._clusters = {}
+        self._variants = None
+
+    def click(self, count=1):
+        self.pending += count
+
+    def flush(self):
+        """Play one cluster for the clicks collected since the last flush. Returns True if it played."""
+        n = self.pending
+        if not n:
+            return False
+        self.pending = 0
+        if not self.ready:
+            return False
+        # Same expected number of audible clicks as one coin toss per event
+        audible = n // 2 + (n % 2 and random.random() < self.PLAY_PROBABILITY)
+        if not audible:
+            return False
+        random.choice(self._cluster(self._bucket(audible))).play()
+        self.plays += 1
+        return True
+
+    def _bucket(self, n):
+        for size in self.BUCKETS:
+            if n <= size:
+                return size
+        return self.BUCKETS[-1]
+
+    def _click_variants(self):
+        """Single clicks to mix from, float32 shaped (variants, length, channels)."""
+        if self._variants is None:
+            freq, _fmt, channels = pygame.mixer.get_init()
+            if self.synth:
+                bank = load_click_bank(freq, channels)
+            else:
+                samples = pygame.sndarray.array(ASSETS.sound(self.sound_path))
+                bank = samples.reshape((1, samples.shape[0], -1))
+            self._variants = bank.astype(np.float32)
+        return self._variants
+
+    def _cluster(self, size):
+        sounds = self._clusters.get(size)
+        if sounds is None:
+            sounds = self._clusters[size] = []
+            for i in range(self.ALTERNATIVES):
+                # Mixed samples may come from the disk cache, skipping decoding and synthesis
+                pcm = ASSETS.pcm(("click_cluster", pygame.mixer.get_init(), size, i), lambda: self._synthesize(size))
+                sound = pygame.mixer.Sound(buffer=pcm)
+                sound.set_volume(self.volume)
+                sounds.append(sound)
+        return sounds
+
+    def fingerprint(self):
+        """Everything the mixed cluster samples depend on besides the sound file itself."""
+        return (self.synth, self.spread, self.seed, self.BUCKETS, self.ALTERNATIVES,
+                CLICK_VARIANTS, _CLICK_BANK_VERSION)
+
+    def _synthesize(self, size):
+        """ Mixes a cluster of size clicks into int16 samples in the mixer's format. """
+        variants = self._click_variants()
+        if self._rng is None:
+            self._rng = np.random.default_rng(self.seed)
+        n_variants, length = variants.shape[:2]
+        freq, _fmt, channels = pygame.mixer.get_init()
+        spread = max(1, int(self.spread * freq))
+        out = np.zeros((length + spread, variants.shape[2]), dtype=np.float32)
+        offsets = np.sort(self._rng.integers(0, spread, size))
+        offsets[0] = 0  # first click lands on the frame, like a direct play would
+        for off in offsets:
+            # Different clicks at slightly different levels keep big clusters from sounding phasey
+            click = variants[self._rng.integers(n_variants)]
+            out[off:off + length] += click * self._rng.uniform(0.7, 1.0)
+        # Soft-limit the sum instead of clipping it
+        out = 32767.0 * np.tanh(out / 32767.0)
+        if channels == 1:
+            out = out[:, 0]
+        return np.ascontiguousarray(out.astype(np.int16))
+
+    def warm(self):
+        """Synthesize every cluster up front instead of on first use. Needs the mixer initialized."""
+        for size in self.BUCKETS:
+            self._cluster(size)
+        self.ready = True
+
+
+CLICK_MIXER = ClickMixer()
@@ -0,0 +1,302 @@
+"""
+Headless rendering benchmark for the split-flap board.
+
+Runs deterministic scenarios with SDL's dummy video/audio drivers and mock
+weather, so it works in CI without a display or sound card:
+
+    python bench.py                                # all scenarios, default sizes
+    python bench.py --sizes 6x22,24x66 --save baseline.json
+    python bench.py --compare baseline.json        # exits 1 on regressions
+"""
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pygame
+
+from constants import *
+from main import App, SplitFlap
+from styles import STYLE_NAMES
+from quality import QUALITY_NAMES
+
+DT = 1.0 / FPS
+ALLOC_FRAMES = 30  # frames traced per scenario with --allocs
+
+
+def board_window_size(n_rows, n_cols):
+    w = n_cols * CELL_W + (n_cols - 1) * CELL_GAP + LEFT_MARGIN * 2
+    h = n_rows * CELL_H + (n_rows - 1) * CELL_GAP + TOP_MARGIN * 2
+    return w, h
+
+
+def random_text(rng, n_cols):
+    return "".join(rng.choice(CHARSET) for _ in range(n_cols))
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    idx = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+# --- Scenarios ---
+# Each one prepares the board and returns how many frames to run.
+
+def scenario_idle(app, rng):
+    return 120
+
+
+def scenario_refresh(app, rng):
+    for row in app.rows:
+        row.flip_to(random_text(rng, app.n_cols))
+    # Long enough for the slowest cell to cycle the whole CHARSET
+    cascade = app.n_cols * INTER_FLAP_DELAY
+    full_cycle = len(CHARSET) * (FLIP_CLOSE_TIME + FLIP_OPEN_TIME)
+    return int((cascade + full_cycle) * FPS) + 30
+
+
+def scenario_ghost(app, rng):
+    for row in app.rows:
+        row.ghost_flip(probability=0.2)
+    return int(10 * (FLIP_CLOSE_TIME + FLIP_OPEN_TIME) * FPS) + 30
+
+
+SCENARIOS = {"idle": scenario_idle, "ghost": scenario_ghost}
+for _style in STYLE_NAMES:
+    SCENARIOS[f"refresh-{_style}"] = scenario_refresh
+
+
+def prepare_scenario(app, name, seed):
+    """Reset the board to the same settled state, set the scenario up and return its frame count."""
+    style = name.split("-", 1)[1] if name.startswith("refresh-") else "classic"
+    SplitFlap.set_style(style)
+    rng = random.Random(seed)
+    random.seed(seed)  # flaps use the module-level generator for clicks and jitter
+
+    for row in app.rows:
+        row.set_text_immediate(random_text(rng, app.n_cols))
+    app.full_redraw = True
+    app.draw()
+    return SCENARIOS[name](app, rng)
+
+
+def step_frame(app):
+    t0 = time.perf_counter()
+    app.update_board(DT)
+    t1 = time.perf_counter()
+    app.draw()
+    t2 = time.perf_counter()
+    return t1 - t0, t2 - t1
+
+
+def measure_allocs(app, name, seed, n_frames):
+    """Mean peak Python allocation per frame, in a separate pass since tracing skews timings."""
+    prepare_scenario(app, name, seed)
+    alloc_kb = []
+    tracemalloc.start()
+    for _ in range(n_frames):
+        tracemalloc.reset_peak()
+        base, _peak = tracemalloc.get_traced_memory()
+        step_frame(app)
+        _cur, peak = tracemalloc.get_traced_memory()
+        alloc_kb.append((peak - base) / 1024.0)
+    tracemalloc.stop()
+    return statistics.fmean(alloc_kb)
+
+
+def run_scenario(app, name, seed, trace_allocs):
+    n_frames = prepare_scenario(app, name, seed)
+    n_flaps = app.n_rows * app.n_cols
+    update_times, draw_times, frame_times = [], [], []
+    for _ in range(n_frames):
+        t_update, t_draw = step_frame(app)
+        update_times.append(t_update)
+        draw_times.append(t_draw)
+        frame_times.append(t_update + t_draw)
+
+    total_update = sum(update_times) or 1e-9
+    total_draw = sum(draw_times) or 1e-9
+    ms = [t * 1000.0 for t in frame_times]
+    return {
+        "frames": n_frames,
+        "flaps": n_flaps,
+        "frame_ms_mean": statistics.fmean(ms),
+        "frame_ms_p50": percentile(ms, 50),
+        "frame_ms_p95": percentile(ms, 95),
+        "frame_ms_p99": percentile(ms, 99),
+        "frame_ms_max": max(ms),
+        "update_ms_mean": 1000.0 * total_update / n_frames,
+        "draw_ms_mean": 1000.0 * total_draw / n_frames,
+        # Flap-steps per second each phase could sustain on its own
+        "update_flaps_per_s": n_flaps * n_frames / total_update,
+        "draw_flaps_per_s": n_flaps * n_frames / total_draw,
+        "py_alloc_kb_per_frame": measure_allocs(app, name, seed, ALLOC_FRAMES) if trace_allocs else None,
+    }
+
+
+def run(sizes, scenarios, seed, trace_allocs, vector_board=False, renderer="software", quality="full",
+        worker_counts=(None,)):
+    results = {}
+    if renderer != "tiled":
+        worker_counts = (None,)
+    for n_rows, n_cols in sizes:
+        for workers in worker_counts:
+            app = App(use_mock_weather=True, n_rows=n_rows, n_cols=n_cols,
+                      window_size=board_window_size(n_rows, n_cols), locations=["LONDON"],
+                      vector_board=vector_board, renderer=renderer, quality=quality, workers=workers)
+            suffix = "" if workers is None else f"@{workers}w"
+            for name in scenarios:
+                key = f"{n_rows}x{n_cols}/{name}{suffix}"
+                results[key] = run_scenario(app, name, seed, trace_allocs)
+                print(format_row(key, results[key]), flush=True)
+            app.prefetcher.stop()
+            if app.tiles is not None:
+                app.tiles.close()
+    pygame.quit()
+    return results
+
+
+def format_row(key, r):
+    alloc = "-" if r["py_alloc_kb_per_frame"] is None else f"{r['py_alloc_kb_per_frame']:.1f}"
+    return (f"{key:<24} frames={r['frames']:<5} mean={r['frame_ms_mean']:7.2f}ms "
+            f"p50={r['frame_ms_p50']:7.2f} p95={r['frame_ms_p95']:7.2f} p99={r['frame_ms_p99']:7.2f} "
+            f"update={r['update_ms_mean']:6.2f}ms draw={r['draw_ms_mean']:7.2f}ms "
+            f"alloc={alloc}KB/frame")
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # KiB on Linux, bytes on macOS
+    return peak / (2**20 if sys.platform == "darwin" else 2**10)
+
+
+def startup_child(n_rows, n_cols, vector_board, cache_dir):
+    """Build one App in this fresh process, draw its first frame and print the startup cost as JSON."""
+    rss_before = peak_rss_mb()
+    t0 = time.perf_counter()
+    app = App(use_mock_weather=True, n_rows=n_rows, n_cols=n_cols,
+              window_size=board_window_size(n_rows, n_cols), locations=["LONDON"],
+              vector_board=vector_board, render_cache_dir=cache_dir)
+    init_s = time.perf_counter() - t0
+    app.draw()
+    rss_after = peak_rss_mb()
+    app.prefetcher.stop()
+    print(json.dumps({"init_s": init_s, "first_frame_s": app.first_frame_s, "rss_mb": rss_after,
+                      "rss_growth_mb": None if rss_after is None else rss_after - rss_before}))
+
+
+def measure_startup(sizes, vector_board):
+    """
+    Startup time, time to first frame and peak memory per board size, each
+    in its own process: once with an empty render cache, then once warm.
+    """
+    results = {}
+    for n_rows, n_cols in sizes:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            for state in ("cold", "warm"):
+                cmd = [sys.executable, os.path.abspath(__file__), "--startup-child", f"{n_rows}x{n_cols}",
+                       "--startup-cache-dir", cache_dir]
+                if vector_board:
+                    cmd.append("--vector-board")
+                out = subprocess.run(cmd, capture_output=True, text=True, check=True).stdout
+                r = json.loads(out.strip().splitlines()[-1])
+                key = f"{n_rows}x{n_cols}/startup-{state}"
+                results[key] = r
+                print(f"{key:<24} init={r['init_s'] * 1000:8.1f}ms first_frame={r['first_frame_s'] * 1000:8.1f}ms "
+                      f"peak_rss={r['rss_mb']:7.1f}MB growth={r['rss_growth_mb']:7.1f}MB", flush=True)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Return the scenarios whose p95 or mean frame time grew by more than tolerance."""
+    regressions = []
+    for key, r in results.items():
+        base = baseline.get(key)
+        if not base or "frame_ms_mean" not in base:
+            continue
+        for metric in ("frame_ms_mean", "frame_ms_p95"):
+            if base[metric] > 0 and r[metric] > base[metric] * (1 + tolerance):
+                regressions.append(f"{key} {metric}: {base[metric]:.2f} -> {r[metric]:.2f}ms")
+    return regressions
+
+
+def parse_sizes(text):
+    sizes = []
+    for part in text.split(","):
+        rows, cols = part.lower().split("x")
+        sizes.append((int(rows), int(cols)))
+    return sizes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless split-flap rendering benchmark")
+    parser.add_argument("--sizes", default="6x22,12x44", help="comma separated ROWSxCOLS board sizes")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma separated scenario names")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--allocs", action="store_true", help="also trace Python allocations over the first frames of each scenario")
+    parser.add_argument("--vector-board", action="store_true", help="step flaps with the NumPy BoardState")
+    parser.add_argument("--renderer", choices=("software", "sdl2", "tiled"), default="software",
+                        help="sdl2 uses SDL's software renderer under the dummy video driver")
+    parser.add_argument("--workers", default=None,
+                        help="comma separated worker counts to run the tiled renderer with (default: one per CPU)")
+    parser.add_argument("--quality", choices=QUALITY_NAMES, default="full",
+                        help="quality tier to render at; the governor is off while benchmarking")
+    parser.add_argument("--startup", action="store_true", help="measure App startup time and memory instead")
+    parser.add_argument("--startup-child", metavar="SIZE", help=argparse.SUPPRESS)
+    parser.add_argument("--startup-cache-dir", help=argparse.SUPPRESS)
+    parser.add_argument("--save", metavar="PATH", help="write results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a saved baseline")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed slowdown before flagging, 0.15 = 15%%")
+    args = parser.parse_args()
+
+    unknown = [s for s in args.scenarios.split(",") if s not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    if args.startup_child:
+        startup_child(*parse_sizes(args.startup_child)[0], args.vector_board, args.startup_cache_dir)
+        sys.exit(0)
+    if args.startup:
+        results = measure_startup(parse_sizes(args.sizes), args.vector_board)
+    else:
+        worker_counts = [int(n) for n in args.workers.split(",")] if args.workers else [None]
+        if args.renderer == "tiled":
+            print(f"{os.cpu_count()} CPUs")
+        results = run(parse_sizes(args.sizes), args.scenarios.split(","), args.seed, args.allocs, args.vector_board,
+                      args.renderer, args.quality, worker_counts)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as fh:
+            json.dump({"python": platform.python_version(), "pygame": pygame.version.ver,
+                       "results": results}, fh, indent=2)
+        print(f"Saved baseline to {args.save}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as fh:
+            baseline = json.load(fh)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("Regressions:")
+            for line in regressions:
+                print("  " + line)
+            sys.exit(1)
+        print("No regressions against baseline")
@@ -0,0 +1,50 @@
+from functools import lru_cache
+
+from constants import *
+from timeline import FlapTimeline, FlapSnapshot
+
+MINIMAL = "minimal"        # only flaps whose character changes move
+THEATRICAL = "theatrical"  # every flap moves; unchanged ones go round the whole CHARSET
+REFRESH_MODES = (MINIMAL, THEATRICAL)
+
+
+@lru_cache(maxsize=None)
+def flip_path(src, dst):
+    """ Characters an idle flap showing src passes through to reach dst when queued, as FlapTimeline plans them. """
+    s, d = CHAR_INDEX.get(src, 0), CHAR_INDEX.get(dst, 0)
+    force = len(CHARSET) if s == d else 0
+    return "".join(CHARSET[i] for i in FlapTimeline.plan(0.0, FlapSnapshot.idle(s), d, force).chars)
+
+
+def flip_steps(src, dst):
+    return len(flip_path(src, dst)) - 1
+
+
+class BoardDiff:
+    """
+    The text every row is showing, or heading to, kept alongside the flaps.
+    New content is compared against it so only the cells that change get
+    flipped, and nothing has to be read back from the display.
+    """
+
+    def __init__(self, rows):
+        self.rows = list(rows)
+        self.flips = 0        # flap steps queued
+        self.flips_saved = 0  # flap steps a theatrical refresh would have added
+
+    def update(self, row, text, mode=MINIMAL):
+        """
+        Record text as the new content of row. Returns the (col, char) cells to
+        flip: the changed ones, or every cell in theatrical mode.
+        """
+        old = self.rows[row]
+        self.rows[row] = text
+        changed = [(col, new) for col, (cur, new) in enumerate(zip(old, text)) if cur != new]
+        changed_steps = sum(flip_steps(old[col], new) for col, new in changed)
+        all_steps = sum(flip_steps(cur, new) for cur, new in zip(old, text))
+        if mode == THEATRICAL:
+            self.flips += all_steps
+            return list(enumerate(text))
+        self.flips += changed_steps
+        self.flips_saved += all_steps - changed_steps
+        return changed
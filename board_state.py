@@ -0,0 +1,175 @@
+import copy
+
+import numpy as np
+
+from constants import *
+
+# Phase codes, matching SplitFlap.state
+IDLE, CLOSING, OPENING = 0, 1, 2
+PHASE_NAMES = ("idle", "closing", "opening")
+
+_SPACE = CHAR_INDEX[' ']
+_NINE = CHAR_INDEX['9']
+_N_CHARS = len(CHARSET)
+_GHOST_SLOWDOWN = 10.0
+
+
+class BoardState:
+    """
+    Whole-board flap state held in NumPy arrays and stepped with one vectorized
+    update per frame. Follows the same rules as SplitFlap.update and the
+    cascade dispatch in FlapRow.flip_to/update, so large boards don't pay an
+    interpreted loop per cell.
+    """
+
+    def __init__(self, n_rows, n_cols):
+        shape = (n_rows, n_cols)
+        self.shape = shape
+        self.current = np.full(shape, _SPACE, dtype=np.int16)
+        self.next = np.full(shape, _SPACE, dtype=np.int16)
+        self.target = np.full(shape, _SPACE, dtype=np.int16)
+        self.phase = np.zeros(shape, dtype=np.int8)
+        self.timer = np.zeros(shape, dtype=np.float64)
+        self.force_cycles = np.zeros(shape, dtype=np.int16)
+        self.close_time = np.full(shape, FLIP_CLOSE_TIME, dtype=np.float64)
+        self.open_time = np.full(shape, FLIP_OPEN_TIME, dtype=np.float64)
+        self.ghost = np.zeros(shape, dtype=bool)
+        # Cascade: target waiting to be queued (-1 for none) and its remaining delay
+        self.pending_target = np.full(shape, -1, dtype=np.int16)
+        self.pending_delay = np.zeros(shape, dtype=np.float64)
+        # Cells touched outside step(); consumed by the next step's changed mask
+        self._touched = np.zeros(shape, dtype=bool)
+
+    @staticmethod
+    def encode(text, n_cols):
+        """CHARSET indices for a row; unknown characters become spaces, padded or trimmed."""
+        idx = [CHAR_INDEX.get(ch, _SPACE) for ch in text.upper()[:n_cols]]
+        idx += [_SPACE] * (n_cols - len(idx))
+        return np.array(idx, dtype=np.int16)
+
+    def row_text(self, row):
+        return "".join(CHARSET[i] for i in self.current[row])
+
+    # --- Commands (mirror SplitFlap / FlapRow) ---
+
+    def set_text_immediate(self, row, text):
+        idx = self.encode(text, self.shape[1])
+        self.current[row] = idx
+        self.target[row] = idx
+        self.phase[row] = IDLE
+        self.force_cycles[row] = 0
+        self.timer[row] = 0.0
+        self.pending_target[row] = -1
+        self._touched[row] = True
+
+    def flip_to(self, row, text, spacing=INTER_FLAP_DELAY):
+        """Queue a cascade towards text, one spacing apart per column."""
+        self.pending_target[row] = self.encode(text, self.shape[1])
+        self.pending_delay[row] = np.arange(self.shape[1]) * spacing
+
+    def flip_cells(self, row, cols, text, cascade=True, spacing=INTER_FLAP_DELAY):
+        """Queue targets for some columns only, with their cascade delay or none."""
+        if not len(cols):
+            return
+        cols = np.asarray(cols)
+        self.pending_target[row, cols] = [CHAR_INDEX.get(ch, _SPACE) for ch in text]
+        self.pending_delay[row, cols] = cols * spacing if cascade else 0.0
+
+    def queue_target(self, row, col, ch):
+        c = CHAR_INDEX.get(ch, _SPACE)
+        self.target[row, col] = c
+        self.force_cycles[row, col] = _N_CHARS if c == self.current[row, col] else 0
+
+    def ghost_flip(self, row, probability=GHOST_PROBABILITY, rng=np.random):
+        mask = np.zeros(self.shape, dtype=bool)
+        mask[row] = (rng.random_sample(self.shape[1]) < probability) & (self.phase[row] == IDLE)
+        self._start_flip(mask, ghost=True)
+        self._touched |= mask
+        return int(mask.sum())
+
+    # --- Queries ---
+
+    def row_busy(self, row):
+        return bool(
+            (self.pending_target[row] >= 0).any()
+            or (self.phase[row] != IDLE).any()
+            or (self.force_cycles[row] > 0).any()
+            or (self.current[row] != self.target[row]).any()
+        )
+
+    def any_moving(self):
+        return bool((self.current != self.target).any())
+
+    def text_at(self, seconds, dt=1.0 / FPS):
+        """Every row's text `seconds` from now, stepping a copy of the board a frame at a time."""
+        ahead = copy.deepcopy(self)
+        while seconds > 0:
+            ahead.step(min(dt, seconds))
+            seconds -= dt
+        return [ahead.row_text(r) for r in range(self.shape[0])]
+
+    # --- Stepping ---
+
+    def _start_flip(self, mask, ghost=False):
+        if not mask.any():
+            return
+        self.ghost[mask] = ghost
+        # Advance one character, except '9' heading to ' ' which goes straight to ' '
+        shortcut = mask & (self.current == _NINE) & (self.target == _SPACE)
+        regular = mask & ~shortcut
+        self.next[shortcut] = _SPACE
+        self.force_cycles[shortcut] = 0
+        self.next[regular] = (self.current[regular] + 1) % _N_CHARS
+
+        scale = _GHOST_SLOWDOWN if ghost else 1.0
+        self.close_time[mask] = FLIP_CLOSE_TIME * scale
+        self.open_time[mask] = FLIP_OPEN_TIME * scale
+        if ghost:
+            self.next[mask] = self.current[mask]
+        self.phase[mask] = CLOSING
+        self.timer[mask] = 0.0
+
+    def step(self, dt):
+        """
+        Advance every cell by dt. Returns (clicks, changed): the number of click
+        sounds SplitFlap would have started and a mask of cells whose
+        visible state changed or is still animating.
+        """
+        # Cascade dispatch, as in FlapRow.update
+        pending = self.pending_target >= 0
+        if pending.any():
+            self.pending_delay[pending] -= dt
+            due = pending & (self.pending_delay <= 0)
+            if due.any():
+                self.target[due] = self.pending_target[due]
+                self.force_cycles[due] = np.where(self.target[due] == self.current[due], _N_CHARS, 0)
+                self.pending_target[due] = -1
+
+        idle = self.phase == IDLE
+        start_idle = idle & ((self.force_cycles > 0) | (self.current != self.target))
+        moving = ~idle
+
+        self.timer[moving] += dt
+        close_done = moving & (self.phase == CLOSING) & (self.timer >= self.close_time)
+        open_done = moving & (self.phase == OPENING) & (self.timer >= self.open_time)
+
+        # Fully closed: commit to the next character and start opening
+        self.current[close_done] = self.next[close_done]
+        self.timer[close_done] = 0.0
+        self.phase[close_done] = OPENING
+
+        # Fully open: keep cycling or come to rest
+        self.timer[open_done] = 0.0
+        had_force = open_done & (self.force_cycles > 0)
+        self.force_cycles[had_force] -= 1
+        to_idle = open_done & (self.force_cycles == 0) & (self.current == self.target)
+        self.phase[to_idle] = IDLE
+        self.ghost[to_idle] = False
+
+        starts = start_idle | (open_done & ~to_idle)
+        self._start_flip(starts)
+
+        clicks = int(starts.sum()) + int(close_done.sum())
+        changed = moving | starts | self._touched
+        self._touched[:] = False
+        return clicks, changed
@@ -1,3 +1,5 @@
+import os
+
 FPS = 60
 BG_COLOR = (10, 12, 14)
 BOARD_COLOR = (18, 20, 24)
@@ -21,15 +23,48 @@ LEFT_MARGIN = 20
 ROWS = 6
 COLS = 22
 
+FONT_SIZE = 64
+GLYPH_V_OFFSET = 12  # glyphs sit a little low, so letters aren't mostly in the top half
+
 # --- Compute scaling to fit display ---
 BOARD_W = COLS * CELL_W + (COLS - 1) * CELL_GAP + LEFT_MARGIN * 2
 BOARD_H = ROWS * CELL_H + (ROWS - 1) * CELL_GAP + TOP_MARGIN
+# Scale the base layout above to fill the actual display (see layout.py); False keeps it at 1:1
+AUTO_LAYOUT = True
 
 # Animation timings (seconds)
 FLIP_CLOSE_TIME = 0.062   # top half folding down
 FLIP_OPEN_TIME = 0.052    # bottom half opening to reveal next
 INTER_FLAP_DELAY = 0.039  # cascade delay between neighboring cells
 
+# On a refresh: "minimal" flips only the cells that change, "theatrical" flips every cell
+REFRESH_MODE = "minimal"
+
+# Generated caches (weather readings, synthesized audio, ...)
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+
+# Flap click sound, one pre-mixed cluster is played per frame
+CLICK_SYNTH = True        # synthesize clicks with NumPy instead of decoding CLICK_SOUND
+CLICK_SOUND = "./audio/sf-1.mp3"
+CLICK_VARIANTS = 12       # slightly different synthesized clicks (pitch, decay, pan)
+CLICK_VOLUME = 0.05
+
+# Flip animation sprite cache
+FLIP_CACHE_STEPS = 24      # progress steps per flip phase
+FLIP_CACHE_BUDGET_MB = 64  # LRU eviction kicks in above this, at the base cell size; scaled with cell area
+FLIP_CACHE_MAX_MB = 256    # hard cap on the scaled budget, whatever the screen size
+
+# Warming the next refresh's flip sprites while idle
+PRERENDER_SLICE = 0.004   # seconds of work per idle wake-up
+PRERENDER_BUDGET = 0.75   # share of the flip sprite budget one board may warm
+PRERENDER_RETRY = 5.0     # seconds before retrying when the next readings aren't fetched yet
+READINGS_POLL = 1.0       # seconds between checks for the first readings when none were cached
+
+# Quality governor
+QUALITY = "auto"          # "auto" adapts to frame times, or a tier name from quality.py to pin it
+QUALITY_WINDOW = 30       # animated frames averaged before stepping down (4x that before stepping up)
+QUALITY_HEADROOM = 0.6    # step back up once frames average under this share of the budget
+
 TOGGLE_PERIOD = 100.0 # Keeping super high for testing
 
 GHOST_TIMER = 60 * 1 # 1 min
@@ -0,0 +1,141 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+
+import pygame
+
+from constants import CACHE_DIR
+
+# Bump when baking code changes in a way its inputs (the config and files hashed into the name) don't show
+RENDER_CACHE_VERSION = 1
+
+_MAGIC = b"SFRC"
+_HEADER = struct.Struct("<4sII")  # magic, version, index length
+_ALIGN = 16
+
+
+class RenderCache:
+    """
+    Baked surfaces and PCM buffers from a previous run, in one file per
+    configuration under CACHE_DIR. The file name is a hash of the config and
+    of the contents of the given files, so changing either starts a fresh
+    file. The file is memory-mapped and surfaces are created on the mapping
+    with pygame.image.frombuffer, so a warm start neither rasterizes nor
+    decodes anything. Only 32-bit per-pixel-alpha surfaces are stored; others
+    are baked every time.
+    """
+
+    def __init__(self, config, files=(), cache_dir=CACHE_DIR):
+        digest = hashlib.sha1(repr((RENDER_CACHE_VERSION, config)).encode())
+        for path in files:
+            with open(path, "rb") as fh:
+                digest.update(hashlib.sha1(fh.read()).digest())
+        self.path = os.path.join(cache_dir, f"render-{digest.hexdigest()[:16]}.bin")
+        self.hits = 0
+        self.misses = 0
+        self._index = {}   # name -> entry loaded from the file
+        self._map = None
+        self._baked = {}   # name -> (entry, bytes) baked this run
+        self._unsaved = False
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "rb") as fh:
+                # Copy-on-write, so nothing drawn onto a cached surface can reach the file
+                data = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_COPY)
+            magic, version, index_len = _HEADER.unpack_from(data)
+            if magic != _MAGIC or version != RENDER_CACHE_VERSION:
+                raise ValueError("not a render cache of this version")
+            index = json.loads(data[_HEADER.size:_HEADER.size + index_len])
+        except (OSError, ValueError, struct.error) as exc:
+            print(f"Ignoring unreadable render cache {self.path}: {exc}")
+            return
+        self._map = memoryview(data)
+        self._index = index
+
+    def _lookup(self, name, kind):
+        """(entry, data) for name if it is cached as kind, else None."""
+        baked = self._baked.get(name)
+        if baked is not None:
+            return baked
+        entry = self._index.get(name)
+        if entry is None or entry["kind"] != kind:
+            return None
+        return entry, self._map[entry["offset"]:entry["offset"] + entry["length"]]
+
+    def surface(self, key, bake):
+        """The surface stored under key, or bake() (stored for next time)."""
+        name = repr(key)
+        found = self._lookup(name, "surface")
+        if found is not None:
+            self.hits += 1
+            entry, data = found
+            return pygame.image.frombuffer(data, tuple(entry["size"]), "BGRA")
+        surf = bake()
+        self.misses += 1
+        if surf.get_bitsize() == 32 and surf.get_flags() & pygame.SRCALPHA and surf.get_width() * surf.get_height():
+            self._store(name, {"kind": "surface", "size": list(surf.get_size())}, pygame.image.tobytes(surf, "BGRA"))
+        return surf
+
+    def pcm(self, key, bake):
+        """The sample buffer stored under key, or bake()'s array as bytes (stored for next time)."""
+        name = repr(key)
+        found = self._lookup(name, "pcm")
+        if found is not None:
+            self.hits += 1
+            return found[1]
+        self.misses += 1
+        data = bake().tobytes()
+        self._store(name, {"kind": "pcm"}, data)
+        return data
+
+    def _store(self, name, entry, data):
+        entry["length"] = len(data)
+        self._baked[name] = (entry, data)
+        self._unsaved = True
+
+    def save(self):
+        """Write everything loaded or baked so far if anything is new. Returns True if it wrote."""
+        if not self._unsaved:
+            return False
+        entries = {name: (entry, self._map[entry["offset"]:entry["offset"] + entry["length"]])
+                   for name, entry in self._index.items() if name not in self._baked}
+        entries.update(self._baked)
+
+        # Offsets are absolute, so the index has to be sized before they are known: pad it generously
+        index = {name: dict(entry, offset=0) for name, (entry, _data) in entries.items()}
+        index_len = len(json.dumps(index)) + 16 * len(index) + 64
+        offset = _align(_HEADER.size + index_len)
+        for name, (_entry, data) in entries.items():
+            index[name]["offset"] = offset
+            offset = _align(offset + len(data))
+        index_bytes = json.dumps(index).encode().ljust(index_len)
+
+        tmp = self.path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(tmp, "wb") as fh:
+                fh.write(_HEADER.pack(_MAGIC, RENDER_CACHE_VERSION, index_len))
+                fh.write(index_bytes)
+                for name, (_entry, data) in entries.items():
+                    fh.seek(index[name]["offset"])
+                    fh.write(data)
+            os.replace(tmp, self.path)
+        except OSError as exc:
+            print(f"Could not write render cache {self.path}: {exc}")
+            return False
+        self._unsaved = False
+        return True
+
+    def describe(self):
+        state = "warm" if self._index else "cold"
+        return f"{state} render cache, {self.hits} loaded, {self.misses} baked"
+
+
+def _align(n):
+    return (n + _ALIGN - 1) // _ALIGN * _ALIGN
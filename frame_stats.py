@@ -0,0 +1,142 @@
+import json
+import time
+from collections import deque
+
+import pygame
+
+# Phases timed in App.run, in the order they happen
+PHASES = ("events", "timers", "update", "draw", "present")
+
+
+class FrameStats:
+    """
+    Per-frame timings and counters for the main loop. Everything is a plain
+    attribute add so the hot path only pays for perf_counter calls.
+    """
+
+    def __init__(self, window=120):
+        self.frame = 0
+        self.phase_times = dict.fromkeys(PHASES, 0.0)
+        self.flip_time = 0.0     # part of "draw" spent in SplitFlap._draw_flip
+        self.audio_time = 0.0    # part of "update" spent starting click sounds
+        self.active_flaps = 0
+        self.sound_plays = 0
+        self.history = deque(maxlen=window)
+        self._export = None
+        self._phase_start = 0.0
+        self._frame_start = 0.0
+
+    def open_export(self, path):
+        """Append one JSON object per frame to path."""
+        self._export = open(path, "a", encoding="utf-8", buffering=1 << 16)
+
+    def close(self):
+        if self._export:
+            self._export.close()
+            self._export = None
+
+    def begin_frame(self, dt, slept):
+        self.dt = dt
+        self.slept = slept
+        for phase in PHASES:
+            self.phase_times[phase] = 0.0
+        self.flip_time = 0.0
+        self.audio_time = 0.0
+        self.active_flaps = 0
+        self.sound_plays = 0
+        self._frame_start = self._phase_start = time.perf_counter()
+
+    def lap(self, phase):
+        """Charge the time since the previous lap to phase."""
+        now = time.perf_counter()
+        self.phase_times[phase] += now - self._phase_start
+        self._phase_start = now
+
+    def end_frame(self):
+        record = {
+            "frame": self.frame,
+            "t": time.time(),
+            "dt_ms": self.dt * 1000.0,
+            "slept_ms": self.slept * 1000.0,
+            "work_ms": (time.perf_counter() - self._frame_start) * 1000.0,
+            "active_flaps": self.active_flaps,
+            "sound_plays": self.sound_plays,
+            "flip_ms": self.flip_time * 1000.0,
+            "audio_ms": self.audio_time * 1000.0,
+        }
+        for phase in PHASES:
+            record[phase + "_ms"] = self.phase_times[phase] * 1000.0
+        self.history.append(record)
+        if self._export:
+            self._export.write(json.dumps(record) + "\n")
+        self.frame += 1
+        return record
+
+    def averages(self):
+        if not self.history:
+            return {}
+        keys = self.history[-1].keys()
+        n = len(self.history)
+        return {k: sum(r[k] for r in self.history) / n for k in keys if k not in ("frame", "t")}
+
+
+class StatsOverlay:
+    """Small text panel in the bottom-left corner showing rolling FrameStats averages."""
+
+    REFRESH_PERIOD = 0.25  # seconds between text re-renders
+
+    def __init__(self, stats, font_path="fonts/DepartureMono-Regular.otf", size=14):
+        self.stats = stats
+        self.font = pygame.font.Font(font_path, size)
+        self.enabled = False
+        self.rect = None
+        self.extra = None  # callable returning additional lines
+        self._surface = None
+        self._last_render = 0.0
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self._surface = None
+
+    def _lines(self):
+        avg = self.stats.averages()
+        if not avg:
+            return ["collecting..."]
+        fps = 1000.0 / avg["dt_ms"] if avg["dt_ms"] > 0 else 0.0
+        lines = [
+            f"fps {fps:5.1f}  frame {avg['work_ms']:6.2f}ms  slept {avg['slept_ms']:7.1f}ms",
+            "  ".join(f"{phase} {avg[phase + '_ms']:5.2f}" for phase in PHASES),
+            f"flip {avg['flip_ms']:5.2f}ms  audio {avg['audio_ms']:5.2f}ms  "
+            f"active {avg['active_flaps']:5.1f}  sounds {avg['sound_plays']:4.1f}/frame",
+        ]
+        if self.extra:
+            lines.extend(self.extra())
+        return lines
+
+    def panel(self, bg_color):
+        """The rendered panel, re-rendered at most every REFRESH_PERIOD."""
+        now = time.perf_counter()
+        if self._surface is None or now - self._last_render >= self.REFRESH_PERIOD:
+            lines = [self.font.render(line, True, (180, 255, 180)) for line in self._lines()]
+            width = max(l.get_width() for l in lines) + 12
+            height = sum(l.get_height() for l in lines) + 8
+            self._surface = pygame.Surface((width, height))
+            self._surface.fill(bg_color)
+            y = 4
+            for line in lines:
+                self._surface.blit(line, (6, y))
+                y += line.get_height()
+            self._last_render = now
+        return self._surface
+
+    def draw(self, surface, bg_color):
+        """Draw the panel and return the rect that needs presenting."""
+        self.panel(bg_color)
+        sw, sh = surface.get_size()
+        rect = self._surface.get_rect(bottomleft=(0, sh))
+        # Cover whatever a previous, larger panel left behind
+        dirty = rect.union(self.rect) if self.rect else rect
+        surface.fill(bg_color, dirty)
+        surface.blit(self._surface, rect)
+        self.rect = rect
+        return dirty
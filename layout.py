@@ -0,0 +1,50 @@
+from constants import *
+
+
+class BoardLayout:
+    """
+    Cell geometry for an n_rows x n_cols board on a screen of the given size.
+    The base design in constants.py (CELL_W, CELL_GAP, margins, FONT_SIZE) is
+    scaled as a whole to fill the screen, so fonts are rasterized and surfaces
+    baked at the size they are shown at.
+    """
+
+    def __init__(self, screen_w, screen_h, n_rows, n_cols, scale=None):
+        if scale is None:
+            scale = self.fit_scale(screen_w, screen_h, n_rows, n_cols) if AUTO_LAYOUT else 1.0
+        self.scale = scale
+        self.cell_w = max(4, round(CELL_W * scale))
+        self.cell_h = max(4, round(CELL_H * scale))
+        self.gap = max(1, round(CELL_GAP * scale))
+        self.font_size = max(6, round(FONT_SIZE * scale))
+        self.v_offset = round(GLYPH_V_OFFSET * scale)
+
+        board_w = n_cols * self.cell_w + (n_cols - 1) * self.gap
+        board_h = n_rows * self.cell_h + (n_rows - 1) * self.gap
+        self.left = (screen_w - board_w) // 2
+        # Centered in whatever height the width-limited scale leaves over
+        self.top = max(round(TOP_MARGIN * scale), (screen_h - board_h) // 2)
+
+    @staticmethod
+    def fit_scale(screen_w, screen_h, n_rows, n_cols):
+        """Largest scale at which the base design, margins included, fits the screen."""
+        base_w = n_cols * CELL_W + (n_cols - 1) * CELL_GAP + LEFT_MARGIN * 2
+        base_h = n_rows * CELL_H + (n_rows - 1) * CELL_GAP + TOP_MARGIN * 2
+        return min(screen_w / base_w, screen_h / base_h)
+
+    @property
+    def flip_cache_budget(self):
+        """
+        FLIP_CACHE_BUDGET_MB in bytes, scaled with the cell area so the same
+        sprites fit at any size, but never more than FLIP_CACHE_MAX_MB.
+        """
+        area = self.cell_w * self.cell_h / (CELL_W * CELL_H)
+        return round(min(FLIP_CACHE_BUDGET_MB * area, FLIP_CACHE_MAX_MB) * 1024 * 1024)
+
+    def cell_pos(self, row, col):
+        return (self.left + col * (self.cell_w + self.gap),
+                self.top + row * (self.cell_h + self.gap))
+
+    def __repr__(self):
+        return (f"BoardLayout(scale={self.scale:.2f}, cell={self.cell_w}x{self.cell_h}, "
+                f"gap={self.gap}, font={self.font_size}px)")
@@ -1,18 +1,39 @@
+import sys
+from startup import STARTUP
+if "--profile-startup" in sys.argv:
+    STARTUP.enable() # before anything heavy is imported, so the imports below get timed
 import argparse
 import pygame
-import sys
 import math
 import random
 import time
-import numpy as np
-from weather import fetch_weather_update, WEATHER_LOCATIONS
+from collections import Counter
+from weather import fetch_weather_update, has_mock_board, local_time, weather_status, WeatherPrefetcher, WEATHER_LOCATIONS, PENDING_READINGS, NO_DATA_READINGS
+from render_cache import GlyphAtlas, FlipSpriteCache
+from styles import STYLE_PROFILES, next_style
+from quality import QualityGovernor, QUALITY_TIERS, QUALITY_NAMES
+from assets import ASSETS
+from audio import CLICK_MIXER
+from frame_stats import FrameStats, StatsOverlay
+from board_state import BoardState, PHASE_NAMES
+from timeline import FlapTimeline, FlapSnapshot
+from scheduler import Scheduler
+from board_diff import BoardDiff, flip_path, MINIMAL, THEATRICAL, REFRESH_MODES
+from layout import BoardLayout
+from disk_cache import RenderCache
 from constants import *
 from datetime import datetime, timedelta
 
+FLIP_SPRITES = FlipSpriteCache(FLIP_CACHE_BUDGET_MB * 1024 * 1024)
+FRAME_STATS = FrameStats()
+
+
 class SplitFlap:
     """A single split-flap character with a two-phase flip animation."""
     STYLE = "classic"
-    def __init__(self, x, y, w, h, font):
+    PROFILE = STYLE_PROFILES[STYLE]
+    QUALITY = QUALITY_TIERS[0]
+    def __init__(self, x, y, w, h, font, v_offset=GLYPH_V_OFFSET):
         self.rect = pygame.Rect(x, y, w, h)
         self.font = font
         self.current = ' '
@@ -21,217 +42,191 @@ class SplitFlap:
         self.state = 'idle'  # 'idle', 'closing', 'opening'
         self.timer = 0.0
         self.force_cycles = 0
-        self.shadow_surf = pygame.Surface((w, h), pygame.SRCALPHA)
         self.flip_close_time = FLIP_CLOSE_TIME 
         self.flip_open_time = FLIP_OPEN_TIME 
-        self._bake_shadow()
-        self.click_sounds = [pygame.mixer.Sound(f"./audio/sf-1.mp3")]
+        self.ghost = False
+        # Planned flips (None when at rest), looked up against this flap's clock
+        self.timeline = None
+        self.clock = 0.0
+        self.events_seen = 0 # timeline.events() already turned into clicks
+        # Shared by every flap of the same size
+        self.shadow_surf = ASSETS.surface(("flap_shadow", w, h), lambda: self._bake_shadow(w, h))
         self.font_color = (230, 232, 235)
-        self.v_offset = 12 # To avoid having letters mostly in the top half
-
-    def _bake_shadow(self):
-        surf = self.shadow_surf
+        self.v_offset = v_offset # To avoid having letters mostly in the top half
+        self.atlas = GlyphAtlas.get(self.font, self.font_color)
+        self.dirty = True # Needs redrawing on the next frame
+
+    def _glyph(self, ch):
+        # Re-resolve the shared atlas if the font or color was changed on this flap
+        atlas = self.atlas
+        if atlas.font is not self.font or atlas.color != self.font_color:
+            atlas = self.atlas = GlyphAtlas.get(self.font, self.font_color)
+        return atlas.glyph(ch)
+
+    @staticmethod
+    def _bake_shadow(w, h):
+        surf = pygame.Surface((w, h), pygame.SRCALPHA)
         surf.fill((0,0,0,0))
-        # Soft inner shadow
-        border = 6
+        # Soft inner shadow, as wide relative to the cell at any scale
+        border = max(2, round(6 * w / CELL_W))
         darkness = 70
         for i in range(border):
             alpha = int(darkness * (1 - i / border))
             pygame.draw.rect(surf, (0,0,0,alpha),
-                             (i, i, self.rect.w - 2*i, self.rect.h - 2*i), 1, border_radius=6)
+                             (i, i, w - 2*i, h - 2*i), 1, border_radius=border)
+        return surf
 
-    def draw(self, surface):
-        r = self.rect
-        FLAP_BORDER_RADIUS = 4
-
-        # --- Bezel color by style ---
-        if self.STYLE == "classic":
-            bezel_color = tuple(max(0, c - 25) for c in SLOT_COLOR)
-        elif self.STYLE == "matte":
-            bezel_color = tuple(min(255, c + 10) for c in SLOT_COLOR)
-        elif self.STYLE == "retro":
-            bezel_color = (max(0, SLOT_COLOR[0]-40), SLOT_COLOR[1], SLOT_COLOR[2])
-        elif self.STYLE == "paper":
-            bezel_color = tuple(min(255, c + 40) for c in SLOT_COLOR)
-        else:
-            bezel_color = SLOT_COLOR
+    @classmethod
+    def set_style(cls, name):
+        """ Switches every flap to the named style in STYLE_PROFILES. """
+        cls.PROFILE = STYLE_PROFILES[name]
+        cls.STYLE = name
 
-        # --- Draw slot and shadow ---
-        pygame.draw.rect(surface, bezel_color, r, border_radius=FLAP_BORDER_RADIUS)
-        pygame.draw.rect(surface, ACCENT, r, width=2, border_radius=FLAP_BORDER_RADIUS)
-        surface.blit(self.shadow_surf, r.topleft)
+    @classmethod
+    def set_quality(cls, tier):
+        """ Switches every flap to a QualityTier. """
+        cls.QUALITY = tier
 
-        # --- Glyphs ---
-        glyph_cur = self.font.render(self.current, True, self.font_color)
-        glyph_next = self.font.render(self.next_char if self.next_char else self.current, True, self.font_color)
-        gc_rect = glyph_cur.get_rect(center=(r.centerx, r.centery + self.v_offset))
-        gn_rect = glyph_next.get_rect(center=(r.centerx, r.centery + self.v_offset))
+    def draw(self, surface):
+        r = self.rect
+        self.dirty = False
+        overlays = self.PROFILE.overlays(self.shadow_surf)
 
         # --- Idle state ---
         if self.state == 'idle':
-            surface.blit(glyph_cur, gc_rect)
+            surface.blit(overlays.slot, r.topleft)
+            glyph_cur = self._glyph(self.current)
+            surface.blit(glyph_cur, glyph_cur.get_rect(center=(r.centerx, r.centery + self.v_offset)))
             return
 
         # --- Motion progress ---
         if self.state == 'closing':
+            surface.blit(overlays.slot, r.topleft)
             p = min(1.0, self.timer / FLIP_CLOSE_TIME)
-            self._draw_flip(surface, glyph_cur, glyph_next, gc_rect, gn_rect, p, phase='close')
+            self._draw_flip(surface, overlays, p, phase='close')
         elif self.state == 'opening':
+            surface.blit(overlays.open_slot, r.topleft)
             p = min(1.0, self.timer / FLIP_OPEN_TIME)
-            self._draw_flip(surface, glyph_cur, glyph_next, gc_rect, gn_rect, p, phase='open')
-
-            r = self.rect
-            # Slot background and bezel
-            FLAP_BORDER_RADIUS = 4
-            if self.STYLE == "classic":
-                bezel_color = tuple(max(0, c - 25) for c in SLOT_COLOR)
-            else:
-                bezel_color = SLOT_COLOR
+            self._draw_flip(surface, overlays, p, phase='open')
 
-            pygame.draw.rect(surface, bezel_color, r, border_radius=FLAP_BORDER_RADIUS)
-            pygame.draw.rect(surface, ACCENT, r, width=2, border_radius=FLAP_BORDER_RADIUS)
-            surface.blit(self.shadow_surf, r.topleft)
-
-            # Prepare glyph surfaces for current and next
-            glyph_cur = self.font.render(self.current, True, self.font_color)
-            glyph_next = self.font.render(self.next_char if self.next_char else self.current, True, self.font_color)
-
-            # Center glyphs
-            gc_rect = glyph_cur.get_rect(center=(r.centerx, r.centery + self.v_offset))
-            gn_rect = glyph_next.get_rect(center=(r.centerx, r.centery + self.v_offset))
-
-            # Draw depending on state
-            if self.state == 'idle':
-                surface.blit(glyph_cur, gc_rect)
-                return
+    def _draw_flip(self, surface, overlays, p, phase):
+        flip_start = time.perf_counter()
+        r = self.rect
+        profile = self.PROFILE
 
-            # Compute hinge animation progress 0..1
-            if self.state == 'closing':
-                p = min(1.0, self.timer / FLIP_CLOSE_TIME + random.uniform(-0.005, -0.005))
-                # Top half folds down (covering current)
-                self._draw_flip(surface, glyph_cur, glyph_next, gc_rect, gn_rect, p, phase='close')
-            elif self.state == 'opening':
-                p = min(1.0, self.timer / FLIP_OPEN_TIME + random.uniform(-0.005, -0.005))
-                # Bottom half opens to reveal the (committed) current
-                self._draw_flip(surface, glyph_cur, glyph_next, gc_rect, gn_rect, p, phase='open')
-
-    def _draw_flip(self, surface, glyph_cur, glyph_next, gc_rect, gn_rect, p, phase):
+        # --- Quantize progress so the composited halves can be reused ---
+        if profile.jitter:
+            p_key = min(1.0, p * random.uniform(1 - profile.jitter, 1 + profile.jitter))
+        else:
+            p_key = p
+        steps = self.QUALITY.steps
+        step = int(round(max(0.0, p_key) * (steps - 1)))
+
+        cur = self.current
+        nxt = self.next_char if self.next_char else self.current
+        key = self.sprite_key(cur, nxt, phase, step)
+        sprite = FLIP_SPRITES.get(key)
+        if sprite is None:
+            sprite = self._build_flip_sprite(cur, nxt, step / (steps - 1), phase)
+            FLIP_SPRITES.put(key, sprite)
+        surface.blit(sprite, r.topleft)
+
+        # --- Style effects, all baked for this cell size ---
+        if phase == "open":
+            if profile.reflection and 0.2 < p < 0.8:
+                overlays.reflection.set_alpha(int(80 * (1 - abs(0.5 - p) * 2)))
+                surface.blit(overlays.reflection, (r.x, r.y + r.h//2 - 2))
+            elif profile.flicker and random.random() < 0.3:
+                overlays.flicker.set_alpha(random.randint(40, 90))
+                surface.blit(overlays.flicker, (r.x, r.y + r.h//2 - 1))
+        if overlays.gradient is not None and self.QUALITY.gradients:
+            flags = pygame.BLEND_RGBA_ADD if profile.gradient[0] == "add" else pygame.BLEND_RGBA_SUB
+            surface.blit(overlays.gradient, r.topleft, special_flags=flags)
+        if overlays.paper_shadow is not None:
+            surface.blit(overlays.paper_shadow, (r.x + 1, r.y + 1))
+
+        FRAME_STATS.flip_time += time.perf_counter() - flip_start
+
+    def sprite_key(self, cur, nxt, phase, step):
         r = self.rect
+        return (self.atlas, cur, nxt, r.w, r.h, self.v_offset, self.PROFILE.name,
+                self.QUALITY.sprite_key, phase, step)
+
+    def warm_sprite(self, cur, nxt, phase, step):
+        """ Builds the sprite for this step ahead of time. Returns its size in bytes, 0 if it was cached. """
+        key = self.sprite_key(cur, nxt, phase, step)
+        if key in FLIP_SPRITES:
+            return 0
+        sprite = self._build_flip_sprite(cur, nxt, step / (self.QUALITY.steps - 1), phase)
+        FLIP_SPRITES.put(key, sprite)
+        return sprite.get_pitch() * sprite.get_height()
+
+    def _build_flip_sprite(self, cur, nxt, p, phase):
+        """ Composites both glyph halves, the fold and the hinge for one progress step """
+        r = self.rect
+        glyph_cur = self._glyph(cur)
+        glyph_next = self._glyph(nxt)
+        center = (r.w // 2, r.h // 2 + self.v_offset)
 
         # Pre-render halves
         cell = pygame.Surface((r.w, r.h), pygame.SRCALPHA)
         cell_cur = cell.copy(); cell_next = cell.copy()
+        cell_cur.blit(glyph_cur, glyph_cur.get_rect(center=center))
+        cell_next.blit(glyph_next, glyph_next.get_rect(center=center))
 
-        Y_OFFSET = 5 
-        cell_cur.blit(glyph_cur, gc_rect.move(-r.x, -r.y))
-        cell_next.blit(glyph_next, gn_rect.move(-r.x, -r.y))
-
-        # --- Easing function variations ---
-        def ease_in_out(s): return 0.5 - 0.5 * math.cos(math.pi * s)
-        def ease_out_back(x, overshoot=1.25): return 1 + overshoot * ((x - 1)**3 + (x - 1)**2)
-
-        if self.STYLE == "classic" and phase == "open":
-            pe = ease_out_back(p)
-        elif self.STYLE == "retro":
-            pe = ease_in_out(p * random.uniform(0.95, 1.05))  # slight jitter
-        else:
-            pe = ease_in_out(p)
+        pe = self.PROFILE.ease(p, phase)
+        scale = pygame.transform.smoothscale if self.QUALITY.smooth else pygame.transform.scale
 
         top_rect = pygame.Rect(0, 0, r.w, r.h//2)
         bot_rect = pygame.Rect(0, r.h//2, r.w, r.h - r.h//2)
 
         # --- Hinge shadow by style ---
-        if self.STYLE == "classic":
-            hinge_alpha = int(180 * (0.4 + 0.6 * pe))
-        elif self.STYLE == "matte":
-            hinge_alpha = int(80 * (0.2 + 0.8 * pe))
-        elif self.STYLE == "retro":
-            hinge_alpha = int(160 * (0.3 + 0.7 * pe))
-        elif self.STYLE == "paper":
-            hinge_alpha = 0
-        else:
-            hinge_alpha = int(120 * (0.3 + 0.7 * pe))
+        hinge_alpha = self.PROFILE.hinge_alpha(pe)
 
         hinge_line = pygame.Surface((r.w, 2), pygame.SRCALPHA)
         hinge_line.fill((0, 0, 0, hinge_alpha))
 
-        # --- Draw static base glyph ---
-        surface.blit(cell_cur, r.topleft)
+        # --- Static base glyph ---
+        sprite = cell_cur.copy()
 
-        # --- Draw motion halves ---
+        # --- Motion halves ---
         if phase == 'close':
             fold_h = int((r.h//2) * (1 - pe))
             if fold_h > 0:
                 visible_top = cell_cur.subsurface(pygame.Rect(0, 0, r.w, fold_h))
-                surface.blit(visible_top, (r.x, r.y))
+                sprite.blit(visible_top, (0, 0))
             flipped = cell_next.subsurface(top_rect)
             target_h = max(1, int((r.h//2) * (0.15 + 0.85 * (1 - pe))))
-            scaled = pygame.transform.smoothscale(flipped, (r.w, target_h))
-            surface.blit(scaled, (r.x, r.y + (r.h//2 - target_h)))
-            surface.blit(hinge_line, (r.x, r.y + r.h//2 - 1))
+            scaled = scale(flipped, (r.w, target_h))
+            sprite.blit(scaled, (0, r.h//2 - target_h))
+            sprite.blit(hinge_line, (0, r.h//2 - 1))
 
         else:
             fold_h = int((r.h//2) * pe)
             if fold_h < (r.h//2):
                 visible_top = cell_cur.subsurface(top_rect)
-                surface.blit(visible_top, (r.x, r.y))
+                sprite.blit(visible_top, (0, 0))
             flipped = cell_cur.subsurface(bot_rect)
             target_h = max(1, int((r.h//2) * (0.15 + 0.85 * pe)))
-            scaled = pygame.transform.smoothscale(flipped, (r.w, target_h))
-            surface.blit(scaled, (r.x, r.y + r.h//2))
-            surface.blit(hinge_line, (r.x, r.y + r.h//2 - 1))
-
-        # --- Additional style effects ---
-        if self.STYLE == "classic":
-            # Metallic reflection during motion
-            if phase == "open" and 0.2 < p < 0.8:
-                ref = pygame.Surface((r.w, 2), pygame.SRCALPHA)
-                alpha = int(80 * (1 - abs(0.5 - p) * 2))
-                ref.fill((255, 255, 255, alpha))
-                surface.blit(ref, (r.x, r.y + r.h//2 - 2))
-
-            # Central highlight gradient
-            grad = pygame.Surface((r.w, r.h), pygame.SRCALPHA)
-            for y in range(r.h):
-                brightness = int(30 * (1 - abs((y - r.h/2) / (r.h/2))))
-                pygame.draw.line(grad, (brightness, brightness, brightness, 40), (0, y), (r.w, y))
-            surface.blit(grad, r.topleft, special_flags=pygame.BLEND_RGBA_ADD)
-
-        elif self.STYLE == "matte":
-            # Soft ambient light fade
-            grad = pygame.Surface((r.w, r.h), pygame.SRCALPHA)
-            for y in range(r.h):
-                shade = int(10 * (1 - y / r.h))
-                pygame.draw.line(grad, (shade, shade, shade, 25), (0, y), (r.w, y))
-            surface.blit(grad, r.topleft, special_flags=pygame.BLEND_RGBA_SUB)
-
-        elif self.STYLE == "retro":
-            # Flickering highlight
-            if random.random() < 0.3 and phase == "open":
-                flicker = pygame.Surface((r.w, 2), pygame.SRCALPHA)
-                flicker.fill((255, 220, 180, random.randint(40, 90)))
-                surface.blit(flicker, (r.x, r.y + r.h//2 - 1))
-
-        elif self.STYLE == "paper":
-            # Slight shadow offset to mimic paper layer
-            paper_shadow = pygame.Surface((r.w, r.h), pygame.SRCALPHA)
-            paper_shadow.fill((0, 0, 0, 15))
-            surface.blit(paper_shadow, (r.x + 1, r.y + 1))
-
-    def _play_click(self):
-        self.click_sounds[0].set_volume(0.05)
-        if random.random() < 0.5:
-            self.click_sounds[0].play()
-    
-    def _advance_char(self):
-        """ It sets the next_char attr to the next char in CHARSET """
-        if self.current == '9' and self.target == ' ':
-            self.next_char = ' '
-            self.force_cycles = 0
-            return
-        ci = CHAR_INDEX.get(self.current, 0)
-        ni = (ci + 1) % len(CHARSET)
-        self.next_char = CHARSET[ni]
+            scaled = scale(flipped, (r.w, target_h))
+            sprite.blit(scaled, (0, r.h//2))
+            sprite.blit(hinge_line, (0, r.h//2 - 1))
+
+        return sprite
+
+    def _snapshot(self):
+        return FlapSnapshot.idle(CHAR_INDEX.get(self.current, 0))
+
+    def _apply(self, snap):
+        """ Copy a FlapSnapshot from the timeline onto the attributes draw() reads. """
+        self.state = snap.state
+        self.current = CHARSET[snap.current]
+        self.next_char = CHARSET[snap.next]
+        self.target = CHARSET[snap.target]
+        self.timer = snap.timer
+        self.force_cycles = snap.force_cycles
+        self.flip_close_time = snap.close_time
+        self.flip_open_time = snap.open_time
 
     def set_char_immediate(self, c):
         """ No animation, it just initialise the characters """
@@ -240,86 +235,117 @@ class SplitFlap:
         self.state = 'idle'
         self.force_cycles = 0
         self.timer = 0
-
-    def queue_target(self, c):
-        """ It sets the target character, unlike _advance_char which simply moves next_char
-         forward by one char. If character not in char set - set to ' '. """
-        self.target = c if c in CHARSET else ' '
-        if self.target == self.current:
-            self.force_cycles = len(CHARSET)
-        else:
-            self.force_cycles = 0
+        self.timeline = None
+        self.dirty = True
+
+    def queue_target(self, c, delay=0.0):
+        """ It sets the target character `delay` seconds from now and plans every flip needed
+         to reach it. If character not in char set - set to ' '. A flap already showing the
+         target goes round the whole CHARSET once. Replaces any target still waiting on its delay. """
+        target = c if c in CHARSET else ' '
+        at = self.clock + delay
+        base = self.timeline.active_at(self.clock) if self.timeline is not None else None
+        if base is None:
+            # At rest until the delay runs out, so a target queued after this one replaces it
+            rest = self._snapshot()
+            base = FlapTimeline.plan(self.clock, rest, rest.current, 0)
+        snap = base.at(at)
+        force = len(CHARSET) if CHAR_INDEX[target] == snap.current else 0
+        plan = FlapTimeline.plan(at, snap, CHAR_INDEX[target], force)
+        self.timeline = base.then(at, plan) if delay > 0 else plan
+        self.events_seen = self.timeline.events(self.clock)
 
     def start_flip(self, ghost=False):
         self.ghost = ghost
-        self._advance_char()
-
-        close_time = FLIP_CLOSE_TIME
-        open_time  = FLIP_OPEN_TIME
-        
-        if ghost:
-            close_time *= 10.0 
-            open_time  *= 10.0
-            self.next_char = self.current
-
-        self.flip_close_time = close_time
-        self.flip_open_time  = open_time
-
-        self.state = 'closing'
-        self.timer = 0.0
-        self._play_click()
+        snap = self._snapshot()
+        self.timeline = FlapTimeline.plan(self.clock, snap, CHAR_INDEX.get(self.target, 0),
+                                          self.force_cycles, ghost=ghost)
+        self.events_seen = self.timeline.events(self.clock)
+        self._apply(self.timeline.at(self.clock))
+        self.dirty = True
+
+    def char_at(self, t):
+        """ The character showing at flap clock time t, without changing anything. """
+        if self.timeline is None:
+            return self.current
+        return CHARSET[self.timeline.at(t).current]
+
+    def seek(self, t):
+        """ Jump straight to flap clock time t without playing the clicks in between. """
+        self.clock = t
+        if self.timeline is not None:
+            self.events_seen = self.timeline.events(t)
+            self._apply(self.timeline.at(t))
+            if self.timeline.finished(t):
+                self.timeline = None
+                self.ghost = False
+        self.dirty = True
 
     def update(self, dt):
-        if self.state == 'idle':
-            if self.force_cycles > 0 or self.current != self.target:
-                self.start_flip()
+        self.clock += dt
+        timeline = self.timeline
+        if timeline is None:
             return
 
-        self.timer += dt
-        if self.state == 'closing' and self.timer >= self.flip_close_time:
-            # Commit to next char when fully closed
-            self.current = self.next_char
-            self.timer = 0.0
-            self.state = 'opening'
-            self._play_click()
-        elif self.state == 'opening' and self.timer >= self.flip_open_time:
-            # Decide whether to continue flipping toward target
-            self.timer = 0.0
-            if self.force_cycles > 0:
-                self.force_cycles -= 1
-                if self.force_cycles == 0 and self.current == self.target:
-                    self.state = 'idle'
-                    self.ghost = False
-                else:
-                    self.start_flip()
-            elif self.current == self.target:
-                self.state = 'idle'
-                self.ghost = False
-            else:
-                self.start_flip()
+        # Every flip start and fold-down since the last frame clicks, even if frames were skipped
+        events = timeline.events(self.clock)
+        if events != self.events_seen:
+            CLICK_MIXER.click(events - self.events_seen)
+        self.events_seen = events
+        was_idle = self.state == 'idle'
+        self._apply(timeline.at(self.clock))
+        if timeline.finished(self.clock):
+            self.timeline = None
+            self.ghost = False
+        elif timeline.prev is not None and self.clock >= timeline.switch_at:
+            # The queued target has taken over; event counts restart from the new plan alone
+            timeline.prev = None
+            self.events_seen = timeline.events(self.clock)
+        if self.state != 'idle' or not was_idle:
+            self.dirty = True
+            FRAME_STATS.active_flaps += 1
 
 
 class FlapRow:
-    def __init__(self, x, y, n_chars, font):
+    def __init__(self, x, y, n_chars, font, board=None, row_index=0, layout=None):
+        """ With a BoardState, the row's state lives in board[row_index] and the flaps only draw it.
+        layout: a BoardLayout for the cell size, or None for the base CELL_W x CELL_H. """
+        cell_w, cell_h, gap = (layout.cell_w, layout.cell_h, layout.gap) if layout else (CELL_W, CELL_H, CELL_GAP)
+        v_offset = layout.v_offset if layout else GLYPH_V_OFFSET
         self.flaps = []
         for i in range(n_chars):
-            cx = x + i * (CELL_W + CELL_GAP)
-            self.flaps.append(SplitFlap(cx, y, CELL_W, CELL_H, font))
-        self.pending = None
+            cx = x + i * (cell_w + gap)
+            self.flaps.append(SplitFlap(cx, y, cell_w, cell_h, font, v_offset))
+        self.board = board
+        self.row_index = row_index
 
     def set_text_immediate(self, text):
         text = self._normalize(text)
         for f, c in zip(self.flaps, text):
             f.set_char_immediate(c)
+        if self.board is not None:
+            self.board.set_text_immediate(self.row_index, text)
 
     def flip_to(self, text):
         """Queue a flip to the given text with a cascading delay."""
         text = self._normalize(text)
-        self.pending = []
-        t = 0.0
-        for f, c in zip(self.flaps, text):
-            self.pending.append((f, c, t))
-            t += INTER_FLAP_DELAY
+        spacing = SplitFlap.QUALITY.cascade_delay
+        if self.board is not None:
+            self.board.flip_to(self.row_index, text, spacing)
+            return
+        # Each flap plans its whole cascade step up front, so there is nothing to dispatch per frame
+        for i, (f, c) in enumerate(zip(self.flaps, text)):
+            f.queue_target(c, delay=i * spacing)
+
+    def flip_cells(self, cells, cascade=True):
+        """Flip only the given (col, char) cells, keeping each column's cascade delay unless cascade is False."""
+        spacing = SplitFlap.QUALITY.cascade_delay
+        if self.board is not None:
+            cols = [col for col, _c in cells]
+            self.board.flip_cells(self.row_index, cols, "".join(c for _col, c in cells), cascade, spacing)
+            return
+        for col, c in cells:
+            self.flaps[col].queue_target(c, delay=col * spacing if cascade else 0.0)
 
     def _normalize(self, text):
         text = text.upper()
@@ -332,112 +358,207 @@ class FlapRow:
             text = text[:len(self.flaps)]
         return text
 
-    def update(self, dt):
-        # Dispatch pending char targets based on their cascade delay
-        if self.pending:
-            new_pending = []
-            for f, c, delay in self.pending:
-                delay -= dt
-                if delay <= 0:
-                    f.queue_target(c)
-                else:
-                    new_pending.append((f, c, delay))
-            self.pending = new_pending if new_pending else None
-        # Update flaps
-        for f in self.flaps:
-            f.update(dt)
-
     def draw(self, surface):
         for f in self.flaps:
             f.draw(surface)
 
+    def draw_dirty(self, surface, bg_color=BG_COLOR):
+        """Redraw only the flaps that changed since the last frame and return their rects."""
+        rects = []
+        for f in self.flaps:
+            if f.dirty:
+                # 1px margin covers the paper style's offset shadow
+                rect = f.rect.inflate(2, 2)
+                surface.fill(bg_color, rect)
+                f.draw(surface)
+                rects.append(rect)
+        return rects
+
+    def is_busy(self):
+        """True while any flap still has planned flips, including ones waiting on their cascade delay."""
+        if self.board is not None:
+            return self.board.row_busy(self.row_index)
+        return any(f.timeline is not None for f in self.flaps)
+
     def ghost_flip(self, probability=GHOST_PROBABILITY):
         """Trigger a small random ghost flip on some flaps."""
+        if self.board is not None:
+            CLICK_MIXER.click(self.board.ghost_flip(self.row_index, probability))
+            return
         for f in self.flaps:
-            if random.random() < probability and f.state == 'idle':
+            # Leave alone flaps that are moving or waiting on a cascade
+            if random.random() < probability and f.timeline is None:
                 f.start_flip(ghost=True)
 
     def update(self, dt):
-        # keep existing pending handling first
-        if self.pending:
-            new_pending = []
-            for f, c, delay in self.pending:
-                delay -= dt
-                if delay <= 0:
-                    f.queue_target(c)
-                else:
-                    new_pending.append((f, c, delay))
-            self.pending = new_pending if new_pending else None
-
         # Detect if all flaps are idle (finished flipping)
-        if not self.pending and all(f.state == 'idle' for f in self.flaps):
+        if all(f.timeline is None for f in self.flaps):
             if hasattr(self, 'on_complete') and callable(self.on_complete):
                 self.on_complete(self)
                 self.on_complete = None  # only trigger once
 
-        # existing flap updates
         for f in self.flaps:
             f.update(dt)
 
+    def seek(self, dt):
+        """Move every flap dt seconds ahead at once, skipping the frames in between."""
+        for f in self.flaps:
+            f.seek(f.clock + dt)
+
+    def text_at(self, dt):
+        """What the row will show dt seconds from now, if nothing else is queued."""
+        return "".join(f.char_at(f.clock + dt) for f in self.flaps)
+
 
 class App:
-    def __init__(self, use_mock_weather=False):
-        pygame.init()
+    def __init__(self, use_mock_weather=False, n_rows=ROWS, n_cols=COLS, window_size=None, locations=None,
+                 vector_board=False, refresh_mode=REFRESH_MODE, renderer="software", quality=QUALITY,
+                 render_cache_dir=CACHE_DIR, workers=None):
+        """
+        window_size: (w, h) for a windowed display, None for fullscreen.
+        locations: location keys to cycle through, defaults to WEATHER_LOCATIONS.
+        vector_board: step all flaps at once with a NumPy BoardState instead of per flap.
+        refresh_mode: MINIMAL flips only changed cells on a refresh, THEATRICAL flips every cell.
+        renderer: "software" blits surfaces to the display, "sdl2" draws textures with an SDL2
+                  Renderer and falls back to software if that can't be set up, "tiled" draws
+                  bands of rows in worker processes and composites them.
+        quality: "auto" lets a QualityGovernor trade effects for frame time, a tier name pins it.
+        render_cache_dir: where baked glyphs, surfaces and click samples are kept between runs,
+                          None to bake everything every time.
+        workers: worker processes for the tiled renderer, None for one per CPU.
+        """
+        STARTUP.mark("imports")
+        self.started_at = time.perf_counter()
+        self.first_frame_s = None
+        # Only what the first frame needs; audio and the network start after it (_start_background)
+        pygame.display.init()
+        pygame.font.init()
         pygame.display.set_caption("Split-Flap Display – Demo")
-        pygame.mixer.pre_init(44100, -16, 2, 256)
-        pygame.mixer.init()
-        pygame.mixer.set_num_channels(16)
-        self.screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN, display=0)
-        SCREEN_W, SCREEN_H = self.screen.get_size()
+        self.gpu = None
+        if renderer == "sdl2":
+            from texture_renderer import TextureRenderer # pulls in pygame's SDL2 video bindings
+            self.gpu = TextureRenderer.create(window_size)
+        if self.gpu is not None:
+            # The renderer owns the window; there is no display surface to blit to
+            self.screen = None
+            SCREEN_W, SCREEN_H = self.gpu.size
+        else:
+            if window_size:
+                self.screen = pygame.display.set_mode(window_size)
+            else:
+                self.screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN, display=0)
+            SCREEN_W, SCREEN_H = self.screen.get_size()
+        STARTUP.mark("display")
+        self.n_rows = n_rows
+        self.n_cols = n_cols
         self.clock = pygame.time.Clock()
         self.use_mock_weather = use_mock_weather
-        self.locations = [loc["key"] for loc in WEATHER_LOCATIONS] or ["LONDON"]
+        self.locations = list(locations or [loc["key"] for loc in WEATHER_LOCATIONS]) or ["LONDON"]
         self.location_index = 0
         self._pending_location_index = None
         self.current_location_key = self.locations[self.location_index]
-        initial_rows = self._load_location_rows(self.current_location_key)
-        self.refresh_timer = 0.0
-        self.refresh_delay = None
-        self.ghost_timer = 0.0
-        self.minute_update_timer = 0.0
-
-        # Fonts
+        # Not started until after the first frame; requests queue up until then
+        self.prefetcher = WeatherPrefetcher(location_keys=[k for k in self.locations if self._needs_fetch(k)],
+                                            start=False)
+        initial_readings = self._cached_readings(self.current_location_key)
+        # Location shown with placeholders until its first readings arrive, else None
+        self._awaiting_readings = None
+        if initial_readings is None and self._needs_fetch(self.current_location_key):
+            self._awaiting_readings = self.current_location_key
+            # Nothing cached yet: show placeholders now and the readings once they land
+            initial_readings = PENDING_READINGS
+        initial_rows = self._load_location_rows(self.current_location_key, initial_readings)
+        self._prefetch_next_location()
+        STARTUP.mark("weather cache")
+
+        # --- Timed events ---
+        self.scheduler = Scheduler()
+        self._refresh_event = None
+        self._last_row_event = None
+        self._ghost_event = None
+        self._schedule_refresh()
+        self._schedule_ghost()
+        # On the real minute boundary, so the clock row doesn't drift from the wall clock
+        self.scheduler.call_on_boundary(MINUTE_UPDATE_TIMER, self._minute_tick, "minute")
+
+        # Cells and font sized for this screen, rasterized once at that size
+        self.layout = BoardLayout(SCREEN_W, SCREEN_H, n_rows, n_cols)
+        # Larger cells mean larger sprites; a refresh needs as many of them at any size
+        FLIP_SPRITES.budget_bytes = self.layout.flip_cache_budget
         font_path = "fonts/DINMittelschriftStd.otf"
-        self.font = pygame.font.Font(font_path, 64)
-
-        # Build row sized to the longer of the two texts
-        n_chars = COLS
-        total_w = n_chars * CELL_W + (n_chars - 1) * CELL_GAP
-        start_x = (SCREEN_W - total_w) // 2
 
+        # Everything baked below may come from the last run with the same inputs
+        if render_cache_dir:
+            config = (pygame.version.ver, self.layout.cell_w, self.layout.cell_h, self.layout.font_size,
+                      self.layout.v_offset, SLOT_COLOR, ACCENT,
+                      [p.fingerprint(self.layout.cell_h) for p in STYLE_PROFILES.values()],
+                      CLICK_MIXER.fingerprint())
+            ASSETS.disk = RenderCache(config, [font_path] if CLICK_SYNTH else [font_path, CLICK_SOUND],
+                                      render_cache_dir)
+        self.font = ASSETS.font(font_path, self.layout.font_size)
+        STARTUP.mark("font and render cache")
+
+        self.board = BoardState(n_rows, n_cols) if vector_board else None
         self.rows = []
-        for i in range(ROWS):
-            row_y = TOP_MARGIN + i * (CELL_H + CELL_GAP)
-            row = FlapRow(start_x, row_y, n_chars, self.font)
+        for i in range(n_rows):
+            row_x, row_y = self.layout.cell_pos(i, 0)
+            row = FlapRow(row_x, row_y, n_cols, self.font, board=self.board, row_index=i,
+                          layout=self.layout)
             self.rows.append(row)
+        self.tiles = None
+        if renderer == "tiled":
+            from tiled_renderer import TiledRenderer # only the tiled renderer needs multiprocessing
+            self.tiles = TiledRenderer(self.rows, (SCREEN_W, SCREEN_H), font_path, self.layout.font_size,
+                                       FLIP_SPRITES.budget_bytes, workers)
+        STARTUP.mark("flaps")
 
         # Initialize with normalized A and schedule flip to B
         self.current_rows = initial_rows
         self.alt_rows = list(initial_rows)
         for flap_row, text in zip(self.rows, self.current_rows):
             flap_row.set_text_immediate(text)
+        if self.gpu is not None:
+            self.gpu.warm(f for row in self.rows for f in row.flaps)
+        self.refresh_mode = refresh_mode
+        self.content = BoardDiff(row._normalize(text) for row, text in zip(self.rows, self.current_rows))
+        self.board_time = self._parse_board_time()
+        self.next_board_rows = None
+        self._prerender = None
+        self._start_prerender()
 
         self.time_since_toggle = 0.0
         self.is_refreshing = False
+        self.full_redraw = True
+
+        # Frame pacing stats (seconds)
+        self.sleep_time = 0.0
+        self.render_time = 0.0
+        self.stats = FRAME_STATS
+        self.overlay = StatsOverlay(self.stats)
+        self.overlay.extra = self._overlay_extra_lines
+
+        # Rendering quality, adapted to frame times unless pinned to one tier
+        if quality == "auto":
+            self.quality = QualityGovernor(on_change=self._set_quality)
+            SplitFlap.set_quality(self.quality.tier)
+        else:
+            self.quality = None
+            SplitFlap.set_quality(QUALITY_TIERS[QUALITY_NAMES.index(quality)])
+        STARTUP.mark("board state")
 
     def _normalize_rows(self, rows):
         normalized = []
         for row in rows:
             row = row.upper()
             row = ''.join(ch if ch in CHARSET else ' ' for ch in row)
-            if len(row) < COLS:
-                row += ' ' * (COLS - len(row))
-            normalized.append(row[:COLS])
+            if len(row) < self.n_cols:
+                row += ' ' * (self.n_cols - len(row))
+            normalized.append(row[:self.n_cols])
         return normalized
     
-    def _load_location_rows(self, location_key):
+    def _load_location_rows(self, location_key, readings=None):
         try:
-            rows = fetch_weather_update(location_key, use_mock=self.use_mock_weather)
+            rows = fetch_weather_update(location_key, use_mock=self.use_mock_weather, readings=readings)
         except Exception as exc:
             print(f"Failed to load weather for {location_key}: {exc}")
             rows = [
@@ -450,28 +571,154 @@ class App:
             ]
         return self._normalize_rows(rows)
 
+    def _needs_fetch(self, location_key):
+        return not (self.use_mock_weather and has_mock_board(location_key))
+
+    def _cached_readings(self, location_key):
+        """Cached readings (possibly stale, refreshed in the background) or None."""
+        if not self._needs_fetch(location_key):
+            return None
+        return self.prefetcher.get(location_key)
+
+    def _prefetch_next_location(self):
+        next_key = self.locations[(self.location_index + 1) % len(self.locations)]
+        if self._needs_fetch(next_key):
+            self.prefetcher.request(next_key)
+
     def refresh_board(self):
+        """Flip to the next location using prefetched readings; never blocks on I/O."""
         next_index = (self.location_index + 1) % len(self.locations)
         next_key = self.locations[next_index]
-        next_rows = self._load_location_rows(next_key)
+        readings = None
+        if self._needs_fetch(next_key):
+            # Checked first: asking for cached readings queues a retry of its own
+            in_flight = self.prefetcher.is_pending(next_key)
+            readings = self._cached_readings(next_key)
+            if readings is None:
+                # Never fetched: placeholders while the fetch runs, else say it failed
+                readings = PENDING_READINGS if in_flight else NO_DATA_READINGS
+        next_rows = self._load_location_rows(next_key, readings)
         self.location_index = next_index
         self.current_location_key = next_key
         self.current_rows = list(next_rows)
         self.alt_rows = list(next_rows)
-        for i, (flap_row, text) in enumerate(zip(self.rows, next_rows)):
+        for i, text in enumerate(next_rows[:len(self.rows)]):
             if i == 5: # Last row get's set to ""
-                flap_row.flip_to("")
+                self._show_row(i, "")
             else:
-                flap_row.flip_to(text)
-        self.refresh_timer = 0.0
-        self.refresh_delay = 0.0
-        self.minute_update_timer = 0.0
+                self._show_row(i, text)
+        self.board_time = self._parse_board_time()
+        self._schedule_refresh()
+        self.scheduler.cancel(self._last_row_event)
+        self._last_row_event = self.scheduler.call_later(REFRESH_DELAY, self.refresh_last_row, "last row")
+        self._prefetch_next_location()
+        self._start_prerender()
 
     def refresh_last_row(self):
-        self.rows[-1].flip_to(self.alt_rows[-1])
-        self.refresh_delay = None
+        self._show_row(5, self.alt_rows[5])
+        self._last_row_event = None
+        self._start_prerender() # the last row is now known too
+
+    # --- Idle pre-render ---
+
+    def _start_prerender(self):
+        """Work out the next board and warm the sprites its refresh will need, a slice per idle wake-up."""
+        # The texture renderer uploads everything up front and uses no flip sprites;
+        # tile workers bake their own, which the main process can't warm for them
+        self._prerender = self._prerender_steps() if self.gpu is None and self.tiles is None else None
+
+    def _prerender_steps(self):
+        next_key = self.locations[(self.location_index + 1) % len(self.locations)]
+        readings = None
+        if self._needs_fetch(next_key):
+            # Checked first: asking for cached readings queues a refresh of its own
+            in_flight = self.prefetcher.is_pending(next_key)
+            readings = self._cached_readings(next_key)
+            if readings is None and in_flight:
+                # Still being fetched; try again once the prefetch has had time to land
+                self.scheduler.call_later(PRERENDER_RETRY, self._start_prerender, "prerender")
+                return
+            if readings is None:
+                readings = NO_DATA_READINGS # what refresh_board will show
+        self.next_board_rows = self._load_location_rows(next_key, readings)
+
+        # Most used steps first, in case the budget runs out
+        flap = self.rows[0].flaps[0]
+        budget = FLIP_SPRITES.budget_bytes * PRERENDER_BUDGET
+        built = 0
+        for (cur, nxt), _count in self._transition_steps(self.next_board_rows).most_common():
+            for phase, a, b in (('close', cur, nxt), ('open', nxt, nxt)):
+                for step in range(flap.QUALITY.steps):
+                    size = flap.warm_sprite(a, b, phase, step)
+                    if size:
+                        built += size
+                        if built >= budget:
+                            return
+                        yield
+
+    def _transition_steps(self, next_rows):
+        """How often each (from, to) flap step happens when the board refreshes to next_rows."""
+        steps = Counter()
+        theatrical = self.refresh_mode == THEATRICAL
+        blank = " " * self.n_cols
+        for i, text in enumerate(next_rows[:len(self.rows)]):
+            old = self.content.rows[i]
+            new = self.rows[i]._normalize(text)
+            # The last row blanks first and gets its text REFRESH_DELAY later
+            stages = [(old, blank), (blank, new)] if i == 5 else [(old, new)]
+            for src, dst in stages:
+                for a, b in zip(src, dst):
+                    if a != b or theatrical:
+                        path = flip_path(a, b)
+                        steps.update(zip(path, path[1:]))
+        return steps
+
+    def _prerender_slice(self):
+        """Run the pre-render job for at most PRERENDER_SLICE seconds."""
+        if self._prerender is None:
+            return
+        deadline = time.perf_counter() + PRERENDER_SLICE
+        for _ in self._prerender:
+            if time.perf_counter() >= deadline:
+                return
+        self._prerender = None
+
+    def _show_row(self, row_idx, text, mode=None, cascade=True):
+        """Flip row_idx to text, moving only the flaps that change unless the mode is THEATRICAL."""
+        if row_idx >= len(self.rows):
+            return
+        mode = mode or self.refresh_mode
+        flap_row = self.rows[row_idx]
+        text = flap_row._normalize(text)
+        cells = self.content.update(row_idx, text, mode)
+        if mode == THEATRICAL:
+            flap_row.flip_to(text)
+        elif cells:
+            flap_row.flip_cells(cells, cascade)
+
+    def _schedule_refresh(self):
+        # Next full refresh counts from the latest one, however it was triggered
+        self.scheduler.cancel(self._refresh_event)
+        self._refresh_event = self.scheduler.call_later(FULLBOARD_REFRESH_TIMER, self.refresh_board, "refresh")
+
+    def _schedule_ghost(self):
+        self.scheduler.cancel(self._ghost_event)
+        self._ghost_event = self.scheduler.call_every(GHOST_TIMER, self.ghost_flip_all, "ghost")
+
+    def ghost_flip_all(self):
+        for flap_row in self.rows:
+            flap_row.ghost_flip(probability=GHOST_PROBABILITY)
+
+    def _minute_tick(self):
+        # Even mid-cascade: the time is kept apart from the flaps, so there is nothing to wait for
+        self.increment_minute()
 
     def flip_single_flap_to(self, char, row_idx, col_idx):
+        text = self.content.rows[row_idx]
+        self.content.rows[row_idx] = text[:col_idx] + char + text[col_idx + 1:]
+        if self.board is not None:
+            self.board.queue_target(row_idx, col_idx, char)
+            return
         self.rows[row_idx].flaps[col_idx].queue_target(char)
 
     def print_flap_char(self, row_idx, col_idx, **kwargs):
@@ -480,111 +727,324 @@ class App:
     def get_flap_char(self, row_idx, col_idx):
         return self.rows[row_idx].flaps[col_idx].current
 
+    # Where the weather board shows the local time (HH:MM AM/PM)
+    TIME_ROW = 2
+    TIME_COL = 11
+
+    def _parse_board_time(self):
+        """
+        The time shown on the board as a datetime, parsed once when new content
+        arrives. None when the time row holds something else (e.g. an error board).
+        """
+        if self.TIME_ROW >= len(self.content.rows):
+            return None
+        text = self.content.rows[self.TIME_ROW][self.TIME_COL:self.TIME_COL + 8]
+        try:
+            # Live boards pad single-digit hours with a space, mock boards with a zero
+            if text.startswith(" "):
+                text = "0" + text[1:]
+            return datetime.strptime(text, "%I:%M %p")
+        except ValueError:
+            return None
+
     def increment_minute(self):
         """
-        Reads the current time (HH:MM AM/PM) from the display,
-        adds one minute, and updates only the flaps that need to change.
+        Moves the time the board is showing on a minute and updates only the
+        flaps that need to change. Live boards take the location's wall clock,
+        so a missed tick can't leave them behind; mock boards count on from
+        their preset time. The time is kept as a datetime, so nothing is read
+        back from the display.
+        """
+        if self.board_time is None:
+            return
+        if self._needs_fetch(self.current_location_key):
+            self.board_time = local_time(self.current_location_key)
+        else:
+            self.board_time += timedelta(minutes=1)
+        row_text = self.content.rows[self.TIME_ROW]
+        pad = row_text[self.TIME_COL]
+        time_str = self.board_time.strftime("%I:%M %p")
+        if pad == " " and time_str.startswith("0"):
+            time_str = " " + time_str[1:]
+        new_text = row_text[:self.TIME_COL] + time_str + row_text[self.TIME_COL + len(time_str):]
+        # All changed digits at once, as the flaps were queued before
+        self._show_row(self.TIME_ROW, new_text, MINIMAL, cascade=False)
+
+    def board_text_at(self, seconds):
+        """
+        The rows as they will read `seconds` from now: looked up from the flap
+        timelines, or with --vector-board by stepping a copy of the BoardState.
         """
-        row = 2
-
-        # --- 1. Read current characters from the display
-        h1 = self.get_flap_char(row, 11)
-        h2 = self.get_flap_char(row, 12)
-        m1 = self.get_flap_char(row, 14)
-        m2 = self.get_flap_char(row, 15)
-        p1 = self.get_flap_char(row, 17)
-        p2 = self.get_flap_char(row, 18)
-
-        hour_str = f"{h1}{h2}"
-        minute_str = f"{m1}{m2}"
-        period = f"{p1}{p2}"
-
-        time_str = f"{hour_str}:{minute_str} {period}"
-        time_obj = datetime.strptime(time_str, "%I:%M %p") + timedelta(minutes=1)
-
-        new_hour_str = time_obj.strftime("%I")
-        new_minute_str = time_obj.strftime("%M")
-        new_period = time_obj.strftime("%p")
-
-        updates = {
-            11: (h1, new_hour_str[0]),
-            12: (h2, new_hour_str[1]),
-            14: (m1, new_minute_str[0]),
-            15: (m2, new_minute_str[1]),
-            17: (p1, new_period[0]),
-            18: (p2, new_period[1]),
-        }
-
-        for col, (old_char, new_char) in updates.items():
-            if old_char != new_char:
-                self.flip_single_flap_to(new_char, row, col)
+        if self.board is not None:
+            return self.board.text_at(seconds)
+        return [row.text_at(seconds) for row in self.rows]
 
     def any_flaps_are_moving(self):
+        if self.board is not None:
+            return self.board.any_moving()
         for row in self.rows:
             for flap in row.flaps:
                 if flap.current != flap.target:
                     return True
         return False
 
-    def run(self):
-        running = True
-        while running:
-            dt = self.clock.tick(FPS) / 1000.0
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-                elif event.type == pygame.KEYDOWN:
-                    if event.key in (pygame.K_ESCAPE, pygame.K_q):
-                        running = False
-                    elif event.key == pygame.K_SPACE:
-                        self.toggle()
-                    elif event.key == pygame.K_d:
-                        styles = ["classic", "matte", "retro", "paper"]
-                        idx = styles.index(SplitFlap.STYLE)
-                        SplitFlap.STYLE = styles[(idx + 1) % len(styles)]
-                    elif event.key == pygame.K_g:
-                        for flap_row in self.rows:
-                            flap_row.ghost_flip(probability=GHOST_PROBABILITY)
-                        self.ghost_timer = 0.0            
-                    elif event.key == pygame.K_c:
-                        self.refresh_board()
-
-            # Ghost Timer
-            if self.ghost_timer >= GHOST_TIMER: 
-                for flap_row in self.rows:
-                    flap_row.ghost_flip(probability=GHOST_PROBABILITY)
-                self.ghost_timer = 0.0
-
-            # Board refresh
-            if self.refresh_timer >= FULLBOARD_REFRESH_TIMER: 
-                self.refresh_board()
-
-            if self.refresh_delay is not None:
-                self.refresh_delay += dt
-                if self.refresh_delay >= REFRESH_DELAY:
-                    self.refresh_last_row()
-
-            if self.minute_update_timer >= MINUTE_UPDATE_TIMER:
-                if self.any_flaps_are_moving():
-                    pass
-                else:
-                    self.increment_minute()
-                self.minute_update_timer = 0.0
-
-            self.refresh_timer += dt
-            self.ghost_timer += dt
-            self.minute_update_timer += dt
-
-
-            for flap_row in self.rows:
-                flap_row.update(dt)
-            # Draw
+    def draw(self):
+        """Push only changed cells to the display, or everything after a style change."""
+        self._draw()
+        if self.first_frame_s is None:
+            self._first_frame_shown()
+
+    def _first_frame_shown(self):
+        self.first_frame_s = time.perf_counter() - self.started_at
+        STARTUP.mark("first frame")
+        cache = ASSETS.disk.describe() if ASSETS.disk is not None else "no render cache"
+        print(f"First frame {self.first_frame_s * 1000:.0f}ms after start ({cache})")
+        self._start_background()
+        if ASSETS.disk is not None:
+            ASSETS.disk.save()
+
+    def _start_background(self):
+        """Audio and network startup, held back until the board is on screen."""
+        pygame.mixer.pre_init(44100, -16, 2, 256)
+        pygame.mixer.init()
+        pygame.mixer.set_num_channels(16)
+        CLICK_MIXER.warm()
+        STARTUP.mark("audio")
+        STARTUP.report() # before the prefetch thread can import anything
+        self.prefetcher.start()
+        if self._awaiting_readings:
+            self.scheduler.call_later(READINGS_POLL, self._show_first_readings, "readings")
+
+    def _show_first_readings(self):
+        """Replace the startup placeholders once the first fetch for their location has finished."""
+        key = self._awaiting_readings
+        if key != self.current_location_key:
+            return # the board has moved on to another location already
+        if self.prefetcher.is_pending(key):
+            self.scheduler.call_later(READINGS_POLL, self._show_first_readings, "readings")
+            return
+        self._awaiting_readings = None
+        readings = self.prefetcher.cache.get(key)
+        if readings is None:
+            readings = NO_DATA_READINGS # the first fetch failed
+        rows = self._load_location_rows(key, readings)
+        self.current_rows = list(rows)
+        self.alt_rows = list(rows)
+        for i, text in enumerate(rows[:len(self.rows)]):
+            self._show_row(i, text)
+        self.board_time = self._parse_board_time()
+        self._start_prerender()
+
+    def _draw(self):
+        if self.gpu is not None:
+            self._draw_textures()
+            return
+        if self.tiles is not None:
+            self._draw_tiles()
+            return
+        if self.full_redraw:
             self.screen.fill(BG_COLOR)
             for flap_row in self.rows:
                 flap_row.draw(self.screen)
+            if self.overlay.enabled:
+                self.overlay.draw(self.screen, BG_COLOR)
+            self.stats.lap("draw")
+            pygame.display.flip()
+            self.stats.lap("present")
+            self.full_redraw = False
+            return
+
+        rects = []
+        for flap_row in self.rows:
+            rects.extend(flap_row.draw_dirty(self.screen))
+        if self.overlay.enabled:
+            rects.append(self.overlay.draw(self.screen, BG_COLOR))
+        self.stats.lap("draw")
+        if rects:
+            pygame.display.update(rects)
+        self.stats.lap("present")
+
+    def _draw_tiles(self):
+        full = self.full_redraw
+        if full:
+            self.screen.fill(BG_COLOR)
+        rects = self.tiles.draw(self.rows, self.screen, full)
+        if self.overlay.enabled:
+            rects.append(self.overlay.draw(self.screen, BG_COLOR))
+        self.stats.lap("draw")
+        if full:
             pygame.display.flip()
+        elif rects:
+            pygame.display.update(rects)
+        self.stats.lap("present")
+        self.full_redraw = False
+
+    def _draw_textures(self):
+        # Whole frame or nothing: redrawing from textures costs less than tracking rects
+        changed = self.full_redraw or self.overlay.enabled or any(
+            f.dirty for row in self.rows for f in row.flaps)
+        if changed:
+            self.gpu.draw(self.rows, self.overlay if self.overlay.enabled else None)
+        self.stats.lap("draw")
+        if changed:
+            self.gpu.present()
+        self.stats.lap("present")
+        self.full_redraw = False
+
+    def update_board(self, dt):
+        if self.board is None:
+            for flap_row in self.rows:
+                flap_row.update(dt)
+        else:
+            clicks, changed = self.board.step(dt)
+            CLICK_MIXER.click(clicks)
+            self._sync_flaps(changed)
+
+        audio_start = time.perf_counter()
+        if CLICK_MIXER.flush():
+            FRAME_STATS.sound_plays += 1
+        FRAME_STATS.audio_time += time.perf_counter() - audio_start
+
+    def _sync_flaps(self, changed):
+        # Copy the new state into the flaps that draw it, gathering each array once
+        board = self.board
+        rows, cols = changed.nonzero()
+        FRAME_STATS.active_flaps += len(rows)
+        if not len(rows):
+            return
+        fields = zip(
+            rows.tolist(), cols.tolist(),
+            board.current[rows, cols].tolist(), board.next[rows, cols].tolist(),
+            board.target[rows, cols].tolist(), board.phase[rows, cols].tolist(),
+            board.timer[rows, cols].tolist(), board.force_cycles[rows, cols].tolist(),
+            board.close_time[rows, cols].tolist(), board.open_time[rows, cols].tolist(),
+        )
+        for r, c, cur, nxt, target, phase, timer, force, close_time, open_time in fields:
+            f = self.rows[r].flaps[c]
+            f.current = CHARSET[cur]
+            f.next_char = CHARSET[nxt]
+            f.target = CHARSET[target]
+            f.state = PHASE_NAMES[phase]
+            f.timer = timer
+            f.force_cycles = force
+            f.flip_close_time = close_time
+            f.flip_open_time = open_time
+            f.dirty = True
+
+    def is_animating(self):
+        return self.full_redraw or any(row.is_busy() for row in self.rows)
+
+    def seconds_until_next_event(self):
+        """Time until the earliest scheduled event is due, or zero while there is pre-render work."""
+        if self._prerender is not None:
+            return 0.0
+        remaining = self.scheduler.seconds_until_next()
+        return MINUTE_UPDATE_TIMER if remaining is None else remaining
+
+    def _wait_for_events(self):
+        """Sleep until the next timer deadline or an input event, whichever is first."""
+        timeout_ms = max(1, int(math.ceil(self.seconds_until_next_event() * 1000)))
+        start = time.perf_counter()
+        event = pygame.event.wait(timeout_ms)
+        self.sleep_time += time.perf_counter() - start
+        events = pygame.event.get()
+        if event.type != pygame.NOEVENT:
+            events.insert(0, event)
+        return events
+
+    def _overlay_extra_lines(self):
+        lines = [f"sprites {len(FLIP_SPRITES)} {FLIP_SPRITES.used_bytes / 2**20:.1f}MB "
+                 f"hits {FLIP_SPRITES.hits} misses {FLIP_SPRITES.misses}"]
+        lines.append(f"refresh {self.refresh_mode}: {self.content.flips} flips, "
+                     f"{self.content.flips_saved} saved")
+        tier = SplitFlap.QUALITY
+        lines.append(f"quality {tier.name} ({QUALITY_NAMES.index(tier.name) + 1}/{len(QUALITY_TIERS)})"
+                     + (" auto" if self.quality is not None else ""))
+        event = self.scheduler.next_event()
+        if event is not None:
+            lines.append(f"next {event.name} in {self.seconds_until_next_event():.0f}s")
+        for name, breaker in weather_status()["breakers"].items():
+            lines.append(f"weather {breaker['state']} failures {breaker['failures']} "
+                         f"retry {breaker['retry_in']:.0f}s")
+        return lines
+
+    def _set_quality(self, tier):
+        SplitFlap.set_quality(tier)
+        self.full_redraw = True
+        self._start_prerender() # sprites are per tier
+
+    def pacing_report(self):
+        total = self.sleep_time + self.render_time
+        idle_pct = 100.0 * self.sleep_time / total if total else 0.0
+        return (f"Slept {self.sleep_time:.1f}s, rendered {self.render_time:.1f}s "
+                f"({idle_pct:.1f}% asleep)")
 
-        pygame.quit()
+    def run(self):
+        running = True
+        try:
+            while running:
+                # Full frame rate only while something moves, otherwise sleep until needed
+                slept_before = self.sleep_time
+                if self.is_animating():
+                    start = time.perf_counter()
+                    dt = self.clock.tick(FPS) / 1000.0
+                    self.sleep_time += time.perf_counter() - start
+                    flap_dt = dt
+                    events = pygame.event.get()
+                else:
+                    events = self._wait_for_events()
+                    dt = self.clock.tick() / 1000.0
+                    flap_dt = 0.0 # Nothing was moving while we slept
+                frame_start = time.perf_counter()
+                self.stats.begin_frame(dt, self.sleep_time - slept_before)
+
+                for event in events:
+                    if event.type == pygame.QUIT:
+                        running = False
+                    elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                        self.full_redraw = True
+                    elif event.type == pygame.KEYDOWN:
+                        if event.key in (pygame.K_ESCAPE, pygame.K_q):
+                            running = False
+                        elif event.key == pygame.K_SPACE:
+                            self.toggle()
+                        elif event.key == pygame.K_d:
+                            SplitFlap.set_style(next_style(SplitFlap.STYLE))
+                            self.full_redraw = True
+                            self._start_prerender() # sprites are per style
+                        elif event.key == pygame.K_g:
+                            self.ghost_flip_all()
+                            self._schedule_ghost()
+                        elif event.key == pygame.K_c:
+                            self.refresh_board()
+                        elif event.key == pygame.K_p:
+                            self.overlay.toggle()
+                            self.full_redraw = True
+                self.stats.lap("events")
+
+                # Ghost flips, board refreshes, the delayed last row and minute ticks
+                self.scheduler.run_due()
+                if not self.is_animating():
+                    self._prerender_slice()
+                self.stats.lap("timers")
+
+                self.update_board(flap_dt)
+                self.stats.lap("update")
+                self.draw()
+                record = self.stats.end_frame()
+                self.render_time += time.perf_counter() - frame_start
+                if self.quality is not None and flap_dt > 0:
+                    self.quality.record(record["work_ms"] / 1000.0)
+        finally:
+            # Also after an error, so worker processes, shared memory and exports are released
+            print(self.pacing_report())
+            if ASSETS.disk is not None:
+                ASSETS.disk.save() # surfaces for styles switched to since the first frame
+            self.stats.close()
+            self.prefetcher.stop()
+            if self.tiles is not None:
+                self.tiles.close()
+            pygame.quit()
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description="Split-Flap Display Demo")
@@ -593,9 +1053,57 @@ if __name__ == '__main__':
         action="store_true",
         help="use preset board data instead of fetching live weather",
     )
+    parser.add_argument(
+        "--vector-board",
+        action="store_true",
+        help="step the whole board with NumPy arrays instead of one object per flap",
+    )
+    parser.add_argument(
+        "--refresh-mode",
+        choices=REFRESH_MODES,
+        default=REFRESH_MODE,
+        help="flip only the cells that change (minimal) or every cell (theatrical) on a refresh",
+    )
+    parser.add_argument(
+        "--renderer",
+        choices=("software", "sdl2", "tiled"),
+        default="software",
+        help="draw with software surface blits, SDL2 textures (falls back to software) "
+             "or row bands in worker processes (tiled)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="worker processes for the tiled renderer (default: one per CPU)",
+    )
+    parser.add_argument(
+        "--quality",
+        choices=("auto",) + QUALITY_NAMES,
+        default=QUALITY,
+        help="adapt effects to frame times (auto) or pin a quality tier",
+    )
+    parser.add_argument(
+        "--no-render-cache",
+        action="store_true",
+        help="bake glyphs, surfaces and click samples from scratch instead of using the cache",
+    )
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="print how long each import and startup step took, once audio and network are up",
+    )
+    parser.add_argument(
+        "--stats-jsonl",
+        metavar="PATH",
+        help="append per-frame timings and counters to PATH as JSON lines",
+    )
     args = parser.parse_args()
+    if args.stats_jsonl:
+        FRAME_STATS.open_export(args.stats_jsonl)
     try:
-        App(use_mock_weather=args.mock_weather).run()
+        App(use_mock_weather=args.mock_weather, vector_board=args.vector_board,
+            refresh_mode=args.refresh_mode, renderer=args.renderer, quality=args.quality,
+            render_cache_dir=None if args.no_render_cache else CACHE_DIR, workers=args.workers).run()
     except Exception as e:
         print("Error:", e)
         pygame.quit()
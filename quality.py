@@ -0,0 +1,86 @@
+from constants import *
+
+
+class QualityTier:
+    """One rung of rendering quality; lower rungs trade looks for frame time."""
+
+    def __init__(self, name, smooth=True, gradients=True, steps=FLIP_CACHE_STEPS,
+                 cascade_delay=INTER_FLAP_DELAY):
+        self.name = name
+        self.smooth = smooth                # smoothscale the folding halves, else nearest
+        self.gradients = gradients          # draw the style's gradient over moving flaps
+        self.steps = max(2, int(steps))     # progress steps per flip phase
+        self.cascade_delay = cascade_delay  # seconds between neighboring cells starting
+
+    @property
+    def sprite_key(self):
+        """The part of a cached flip sprite's key that depends on this tier."""
+        return (self.smooth, self.steps)
+
+    def __repr__(self):
+        return f"QualityTier({self.name!r})"
+
+
+# Best first; each tier keeps the savings of the ones above it
+QUALITY_TIERS = (
+    QualityTier("full"),
+    QualityTier("nearest", smooth=False),
+    QualityTier("flat", smooth=False, gradients=False),
+    QualityTier("coarse", smooth=False, gradients=False, steps=FLIP_CACHE_STEPS // 2),
+    QualityTier("sparse", smooth=False, gradients=False, steps=FLIP_CACHE_STEPS // 2,
+                cascade_delay=INTER_FLAP_DELAY * 2),
+)
+QUALITY_NAMES = tuple(tier.name for tier in QUALITY_TIERS)
+
+
+class QualityGovernor:
+    """
+    Watches the work time of animated frames and moves between QUALITY_TIERS:
+    down one tier when a window of frames averages over the frame budget, up
+    one when a longer window stays well under it. The longer wait before
+    stepping up keeps it from bouncing between two tiers.
+    """
+
+    def __init__(self, budget=1.0 / FPS, tiers=QUALITY_TIERS, window=QUALITY_WINDOW,
+                 headroom=QUALITY_HEADROOM, on_change=None):
+        self.budget = budget
+        self.tiers = tiers
+        self.window = window
+        self.headroom = headroom    # step up below this share of the budget
+        self.on_change = on_change  # called with the new tier
+        self.level = 0
+        self.changes = 0
+        self._total = 0.0
+        self._frames = 0
+
+    @property
+    def tier(self):
+        return self.tiers[self.level]
+
+    def record(self, work):
+        """Account one animated frame that took work seconds. Returns the new tier if it changed."""
+        self._total += work
+        self._frames += 1
+        mean = self._total / self._frames
+        if self._frames >= self.window and mean > self.budget and self.level < len(self.tiers) - 1:
+            return self._move(1, mean)
+        if self._frames >= self.window * 4:
+            if mean < self.budget * self.headroom and self.level > 0:
+                return self._move(-1, mean)
+            self._reset()
+        return None
+
+    def _move(self, step, mean):
+        old = self.tier
+        self.level += step
+        self.changes += 1
+        self._reset()
+        print(f"Quality {old.name} -> {self.tier.name}: "
+              f"{mean * 1000:.1f}ms mean frame, budget {self.budget * 1000:.1f}ms")
+        if self.on_change:
+            self.on_change(self.tier)
+        return self.tier
+
+    def _reset(self):
+        self._total = 0.0
+        self._frames = 0
@@ -0,0 +1,92 @@
+from collections import OrderedDict
+
+from assets import ASSETS
+from constants import CHARSET
+
+
+class GlyphAtlas:
+    """Every CHARSET glyph pre-rendered once for a given font and color."""
+
+    _atlases = {}
+
+    def __init__(self, font, color):
+        self.font = font
+        self.color = tuple(color)
+        self.glyphs = {}
+        font_key = ASSETS.font_key(font)
+        for ch in CHARSET:
+            if font_key is None:
+                self.glyphs[ch] = font.render(ch, True, self.color)
+            else:
+                # Fonts loaded by file can be keyed by it, so their glyphs can come from the disk cache
+                self.glyphs[ch] = ASSETS.surface(("glyph", font_key, self.color, ch),
+                                                 lambda ch=ch: font.render(ch, True, self.color))
+
+    @classmethod
+    def get(cls, font, color):
+        """ Returns the atlas shared by every flap using this font and color. """
+        key = (font, tuple(color))
+        atlas = cls._atlases.get(key)
+        if atlas is None:
+            atlas = cls(font, color)
+            cls._atlases[key] = atlas
+        return atlas
+
+    @classmethod
+    def clear(cls):
+        cls._atlases.clear()
+
+    def glyph(self, ch):
+        surf = self.glyphs.get(ch)
+        if surf is None:
+            # Characters outside CHARSET are rare, cache them on first use
+            surf = self.font.render(ch, True, self.color)
+            self.glyphs[ch] = surf
+        return surf
+
+
+class FlipSpriteCache:
+    """LRU cache of composited flip sprites, bounded by a memory budget in bytes."""
+
+    def __init__(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._sprites = OrderedDict()
+
+    def __len__(self):
+        return len(self._sprites)
+
+    def __contains__(self, key):
+        # Membership only: doesn't count as a hit or refresh the entry
+        return key in self._sprites
+
+    def get(self, key):
+        sprite = self._sprites.get(key)
+        if sprite is None:
+            self.misses += 1
+            return None
+        self._sprites.move_to_end(key)
+        self.hits += 1
+        return sprite
+
+    def put(self, key, sprite):
+        old = self._sprites.pop(key, None)
+        if old is not None:
+            self.used_bytes -= _surface_bytes(old)
+        self._sprites[key] = sprite
+        self.used_bytes += _surface_bytes(sprite)
+        # Evict least recently used sprites, always keeping the newest one
+        while self.used_bytes > self.budget_bytes and len(self._sprites) > 1:
+            _, evicted = self._sprites.popitem(last=False)
+            self.used_bytes -= _surface_bytes(evicted)
+
+    def clear(self):
+        self._sprites.clear()
+        self.used_bytes = 0
+
+
+def _surface_bytes(surf):
+    return surf.get_pitch() * surf.get_height()
+
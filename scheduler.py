@@ -0,0 +1,97 @@
+import heapq
+import itertools
+import time
+
+
+class ScheduledEvent:
+    """Handle for one entry in a Scheduler; pass it to Scheduler.cancel()."""
+
+    __slots__ = ("when", "callback", "name", "interval", "aligned", "cancelled")
+
+    def __init__(self, when, callback, name, interval=None, aligned=False):
+        self.when = when
+        self.callback = callback
+        self.name = name
+        self.interval = interval  # seconds between repeats, None for one-shot
+        self.aligned = aligned    # repeats land on wall-clock multiples of interval
+        self.cancelled = False
+
+
+class Scheduler:
+    """
+    Every timed event of the app in one heap ordered by deadline on a
+    monotonic clock. run_due() only pops what is due, so a frame with nothing
+    due costs one comparison however many events are waiting. Cancelled
+    events stay in the heap and are dropped when they reach the top.
+    """
+
+    def __init__(self, clock=time.monotonic, wall_clock=time.time):
+        self.clock = clock
+        self.wall_clock = wall_clock
+        self._heap = []
+        self._seq = itertools.count()  # keeps equal deadlines in scheduling order
+
+    def _push(self, event):
+        heapq.heappush(self._heap, (event.when, next(self._seq), event))
+        return event
+
+    def call_later(self, delay, callback, name=None):
+        return self._push(ScheduledEvent(self.clock() + delay, callback, name))
+
+    def call_every(self, interval, callback, name=None):
+        """Run callback every interval seconds, the first time interval seconds from now."""
+        return self._push(ScheduledEvent(self.clock() + interval, callback, name, interval))
+
+    def call_on_boundary(self, period, callback, name=None):
+        """Run callback whenever the wall clock crosses a multiple of period (e.g. each real minute)."""
+        return self._push(ScheduledEvent(self._next_boundary(period), callback, name, period, aligned=True))
+
+    def _next_boundary(self, period, min_wait=0.0):
+        remaining = period - self.wall_clock() % period
+        if remaining < min_wait:
+            remaining += period
+        return self.clock() + remaining
+
+    def cancel(self, event):
+        if event is not None:
+            event.cancelled = True
+
+    def _peek(self):
+        heap = self._heap
+        while heap and heap[0][2].cancelled:
+            heapq.heappop(heap)
+        return heap[0][2] if heap else None
+
+    def next_event(self):
+        return self._peek()
+
+    def seconds_until_next(self):
+        """Seconds until the earliest pending event, or None if there is none."""
+        event = self._peek()
+        if event is None:
+            return None
+        return max(0.0, event.when - self.clock())
+
+    def run_due(self):
+        """Run every event whose deadline has passed. Returns how many ran."""
+        now = self.clock()
+        ran = 0
+        while True:
+            event = self._peek()
+            if event is None or event.when > now:
+                return ran
+            heapq.heappop(self._heap)
+            if event.interval is not None:
+                # Re-arm before running so the callback may cancel it
+                if event.aligned:
+                    # Recomputed from the wall clock each time, so it never drifts; the
+                    # minimum wait keeps a slightly early wake-up from firing twice
+                    event.when = self._next_boundary(event.interval, event.interval / 2)
+                else:
+                    event.when = max(event.when + event.interval, now)
+                self._push(event)
+            event.callback()
+            ran += 1
+
+    def __len__(self):
+        return sum(1 for _when, _seq, event in self._heap if not event.cancelled)
@@ -0,0 +1,59 @@
+import builtins
+import sys
+import time
+
+
+class StartupProfile:
+    """
+    Where the time goes between launch and the board being fully up: each
+    module main.py imports, then each named step of App startup. Imports are
+    only timed once enable() has wrapped __import__, which main.py does for
+    --profile-startup before it imports anything heavy.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.enabled = False
+        self.imports = []  # (module, seconds), nested imports counted in their importer
+        self.steps = []    # (step, seconds since the previous step)
+        self._last = self.start
+        self._depth = 0
+        self._import = None
+
+    def enable(self):
+        self.enabled = True
+        self._import = builtins.__import__
+        builtins.__import__ = self._timed_import
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if self._depth or (level == 0 and name in sys.modules):
+            return self._import(name, globals, locals, fromlist, level)
+        self._depth += 1
+        start = time.perf_counter()
+        try:
+            return self._import(name, globals, locals, fromlist, level)
+        finally:
+            self._depth -= 1
+            self.imports.append((name, time.perf_counter() - start))
+
+    def mark(self, step):
+        """Charge the time since the previous mark to step."""
+        now = time.perf_counter()
+        self.steps.append((step, now - self._last))
+        self._last = now
+
+    def report(self):
+        """Stop timing imports and print the breakdown, if enabled."""
+        if not self.enabled:
+            return
+        builtins.__import__ = self._import
+        self.enabled = False
+        print("Startup profile (ms)")
+        for name, seconds in sorted(self.imports, key=lambda item: -item[1]):
+            print(f"  import {name:<24} {seconds * 1000:8.1f}")
+        for step, seconds in self.steps:
+            print(f"  {step:<31} {seconds * 1000:8.1f}")
+        print(f"  {'total':<31} {(self._last - self.start) * 1000:8.1f}")
+
+
+STARTUP = StartupProfile()
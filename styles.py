@@ -0,0 +1,140 @@
+import math
+
+import pygame
+
+from assets import ASSETS
+from constants import *
+
+FLAP_BORDER_RADIUS = 4
+
+
+class StyleOverlays:
+    """Everything a style paints around and over one cell size, baked once."""
+
+    def __init__(self, profile, shadow):
+        w, h = shadow.get_size()
+        key = ("style", profile.name, w, h)
+        self.slot = ASSETS.surface(key + ("slot",), lambda: self._bake_slot(profile.bezel, shadow))
+        if profile.open_bezel == profile.bezel:
+            self.open_slot = self.slot
+        else:
+            self.open_slot = ASSETS.surface(key + ("open_slot",), lambda: self._bake_slot(profile.open_bezel, shadow))
+        self.gradient = None
+        if profile.gradient is not None:
+            self.gradient = ASSETS.surface(key + ("gradient",), lambda: self._bake_gradient(profile, w, h))
+        self.paper_shadow = None
+        if profile.paper_shadow:
+            self.paper_shadow = pygame.Surface((w, h), pygame.SRCALPHA)
+            self.paper_shadow.fill((0, 0, 0, profile.paper_shadow))
+        # Full-strength strips; their surface alpha is set when they are drawn
+        self.reflection = self._strip(w, (255, 255, 255))
+        self.flicker = self._strip(w, (255, 220, 180))
+
+    @staticmethod
+    def _bake_slot(bezel, shadow):
+        surf = pygame.Surface(shadow.get_size(), pygame.SRCALPHA)
+        local = surf.get_rect()
+        pygame.draw.rect(surf, bezel, local, border_radius=FLAP_BORDER_RADIUS)
+        pygame.draw.rect(surf, ACCENT, local, width=2, border_radius=FLAP_BORDER_RADIUS)
+        surf.blit(shadow, (0, 0))
+        return surf
+
+    @staticmethod
+    def _bake_gradient(profile, w, h):
+        _blend, alpha, _shade = profile.gradient
+        # One pixel column, stretched sideways: nearest scaling keeps every row's level exact
+        column = pygame.Surface((1, h), pygame.SRCALPHA)
+        for y, v in enumerate(profile.gradient_levels(h)):
+            column.set_at((0, y), (v, v, v, alpha))
+        return pygame.transform.scale(column, (w, h))
+
+    @staticmethod
+    def _strip(w, color):
+        strip = pygame.Surface((w, 2), pygame.SRCALPHA)
+        strip.fill((*color, 255))
+        return strip
+
+
+class StyleProfile:
+    """
+    A flap style as data: colors, easing, hinge shading and effects. The
+    drawing code reads these fields instead of branching on the style name,
+    and the overlays are baked per cell size the first time they are used.
+    """
+
+    def __init__(self, name, bezel, open_bezel=None, overshoot=False, hinge=(120, 0.3),
+                 gradient=None, reflection=False, flicker=False, paper_shadow=0, jitter=0.0):
+        self.name = name
+        self.bezel = bezel
+        # The bezel shown while a flap opens; the original renderer painted it separately
+        self.open_bezel = open_bezel if open_bezel is not None else bezel
+        self.overshoot = overshoot        # opening flaps swing past flat and settle
+        self.hinge = hinge                # (peak alpha, share present at rest)
+        self.gradient = gradient          # ("add" | "sub", alpha, shade(y / h)) or None
+        self.reflection = reflection      # metallic glint along the hinge while opening
+        self.flicker = flicker            # random warm glint along the hinge while opening
+        self.paper_shadow = paper_shadow  # alpha of a 1px offset shadow, 0 for none
+        self.jitter = jitter              # random spread applied to flip progress
+        self._overlays = {}
+
+    def ease(self, p, phase):
+        """Eased progress of a flip phase."""
+        if self.overshoot and phase == "open":
+            return 1 + 1.25 * ((p - 1)**3 + (p - 1)**2)
+        return 0.5 - 0.5 * math.cos(math.pi * p)
+
+    def hinge_alpha(self, pe):
+        peak, rest = self.hinge
+        return max(0, min(255, int(peak * (rest + (1 - rest) * pe))))
+
+    def gradient_levels(self, h):
+        """Gradient brightness of each pixel row of a cell h pixels tall."""
+        shade = self.gradient[2]
+        return [shade(y / h) for y in range(h)]
+
+    def fingerprint(self, h):
+        """Everything about this profile that ends up in baked pixels for cells h pixels tall."""
+        gradient = None
+        if self.gradient is not None:
+            gradient = (self.gradient[0], self.gradient[1], self.gradient_levels(h))
+        return (self.name, self.bezel, self.open_bezel, gradient, self.paper_shadow)
+
+    def overlays(self, shadow):
+        """The StyleOverlays for cells the size of shadow (the flap's baked inner shadow)."""
+        size = shadow.get_size()
+        baked = self._overlays.get(size)
+        if baked is None:
+            baked = self._overlays[size] = StyleOverlays(self, shadow)
+        return baked
+
+
+def _darker(color, amount):
+    return tuple(max(0, c - amount) for c in color)
+
+
+def _lighter(color, amount):
+    return tuple(min(255, c + amount) for c in color)
+
+
+STYLE_PROFILES = {
+    "classic": StyleProfile(
+        "classic", _darker(SLOT_COLOR, 25), overshoot=True, hinge=(180, 0.4),
+        # Central highlight, brightest at the hinge
+        gradient=("add", 40, lambda t: int(30 * (1 - abs(2 * t - 1)))),
+        reflection=True),
+    "matte": StyleProfile(
+        "matte", _lighter(SLOT_COLOR, 10), open_bezel=SLOT_COLOR, hinge=(80, 0.2),
+        # Soft ambient fade from the top
+        gradient=("sub", 25, lambda t: int(10 * (1 - t)))),
+    "retro": StyleProfile(
+        "retro", (max(0, SLOT_COLOR[0] - 40), SLOT_COLOR[1], SLOT_COLOR[2]), open_bezel=SLOT_COLOR,
+        hinge=(160, 0.3), flicker=True, jitter=0.05),
+    "paper": StyleProfile(
+        "paper", _lighter(SLOT_COLOR, 40), open_bezel=SLOT_COLOR, hinge=(0, 0.0), paper_shadow=15),
+}
+STYLE_NAMES = tuple(STYLE_PROFILES)
+
+
+def next_style(name):
+    """The style after name in STYLE_NAMES, wrapping round."""
+    return STYLE_NAMES[(STYLE_NAMES.index(name) + 1) % len(STYLE_NAMES)]
@@ -0,0 +1,190 @@
+import random
+
+import pygame
+
+from constants import *
+from styles import STYLE_PROFILES, STYLE_NAMES
+
+try:
+    from pygame._sdl2.video import Window, Renderer, Texture
+except ImportError:  # pygame built without SDL2 video bindings
+    Window = Renderer = Texture = None
+
+# SDL_BlendMode values
+BLEND = 1
+ADD = 2
+MOD = 4
+
+
+class TextureRenderer:
+    """
+    Draws the board with an SDL2 Renderer instead of software blits. Every
+    character is uploaded once as a cell-sized texture; a flip is the same
+    textures drawn with a squashed destination rect, so scaling happens on
+    the GPU (or in SDL's own software renderer, which is what the dummy
+    video driver gets).
+    """
+
+    def __init__(self, window_size=None, title="Split-Flap Display – Demo"):
+        if window_size:
+            self.window = Window(title, size=window_size)
+        else:
+            self.window = Window(title, size=pygame.display.get_desktop_sizes()[0], fullscreen_desktop=True)
+        self.renderer = Renderer(self.window, accelerated=-1)
+        self.size = self.window.size
+        self._cells = {}       # (cell size, font, color, v_offset) -> {char: Texture}
+        self._slots = {}       # (cell size, style, opening) -> Texture
+        self._gradients = {}   # (cell size, style) -> Texture
+        self._panel = None     # (surface, Texture) of the stats overlay
+
+    @classmethod
+    def create(cls, window_size=None):
+        """A TextureRenderer, or None (with the reason printed) if SDL2 rendering isn't available."""
+        if Renderer is None:
+            print("SDL2 renderer not available in this pygame build, using software rendering")
+            return None
+        try:
+            return cls(window_size)
+        except pygame.error as exc:
+            print(f"Could not create SDL2 renderer ({exc}), using software rendering")
+            return None
+
+    # --- Baked textures ---
+
+    def _cell_textures(self, flap):
+        r = flap.rect
+        key = (r.size, flap.font, flap.font_color, flap.v_offset)
+        cells = self._cells.get(key)
+        if cells is None:
+            cells = self._cells[key] = {}
+            center = (r.w // 2, r.h // 2 + flap.v_offset)
+            for ch in CHARSET:
+                surf = pygame.Surface(r.size, pygame.SRCALPHA)
+                glyph = flap._glyph(ch)
+                surf.blit(glyph, glyph.get_rect(center=center))
+                cells[ch] = self._texture(surf, BLEND)
+        return cells
+
+    def _slot_texture(self, flap, profile, opening=False):
+        """Bezel, border and inner shadow in one texture, the same slot SplitFlap.draw blits."""
+        key = (flap.rect.size, profile.name, opening)
+        tex = self._slots.get(key)
+        if tex is None:
+            overlays = profile.overlays(flap.shadow_surf)
+            surf = overlays.open_slot if opening else overlays.slot
+            tex = self._slots[key] = self._texture(surf, BLEND)
+        return tex
+
+    def _gradient_texture(self, flap, profile):
+        """The profile's gradient as an added (highlight) or multiplied (fade) texture."""
+        r = flap.rect
+        key = (r.size, profile.name)
+        if key in self._gradients:
+            return self._gradients[key]
+        tex = None
+        if profile.gradient is not None:
+            additive = profile.gradient[0] == "add"
+            column = pygame.Surface((1, r.h))
+            for y, v in enumerate(profile.gradient_levels(r.h)):
+                if not additive:
+                    # Subtracting a few levels from the dark board is close to scaling it down
+                    v = 255 - 3 * v
+                column.set_at((0, y), (v, v, v))
+            surf = pygame.transform.scale(column, r.size)
+            tex = self._texture(surf, ADD if additive else MOD)
+        self._gradients[key] = tex
+        return tex
+
+    def _texture(self, surf, blend_mode):
+        tex = Texture.from_surface(self.renderer, surf)
+        tex.blend_mode = blend_mode
+        return tex
+
+    def warm(self, flaps, styles=STYLE_NAMES):
+        """Upload every texture these flaps can need up front."""
+        for flap in flaps:
+            self._cell_textures(flap)
+            for style in styles:
+                profile = STYLE_PROFILES[style]
+                self._slot_texture(flap, profile)
+                self._slot_texture(flap, profile, opening=True)
+                self._gradient_texture(flap, profile)
+
+    # --- Drawing ---
+
+    def draw(self, rows, overlay=None):
+        """Redraw the whole frame; textures make that cheaper than tracking dirty cells."""
+        renderer = self.renderer
+        renderer.draw_color = (*BG_COLOR, 255)
+        renderer.clear()
+        renderer.draw_blend_mode = BLEND
+        for row in rows:
+            for flap in row.flaps:
+                self.draw_flap(flap)
+        if overlay is not None:
+            self._draw_panel(overlay.panel(BG_COLOR))
+
+    def present(self):
+        self.renderer.present()
+
+    def draw_flap(self, flap):
+        r = flap.rect
+        flap.dirty = False
+        profile = flap.PROFILE
+        self._slot_texture(flap, profile, opening=flap.state == 'opening').draw(dstrect=r)
+        cells = self._cell_textures(flap)
+        cur = cells.get(flap.current, cells[' '])
+        if flap.state == 'idle':
+            cur.draw(dstrect=r)
+            return
+
+        if flap.state == 'closing':
+            phase = 'close'
+            p = min(1.0, flap.timer / FLIP_CLOSE_TIME)
+        else:
+            phase = 'open'
+            p = min(1.0, flap.timer / FLIP_OPEN_TIME)
+        if profile.jitter:
+            p = min(1.0, p * random.uniform(1 - profile.jitter, 1 + profile.jitter))
+        pe = profile.ease(p, phase)
+        half = r.h // 2
+
+        cur.draw(dstrect=r)
+        if phase == 'close':
+            # Top half of the next character folding down onto the hinge
+            nxt = cells.get(flap.next_char or flap.current, cur)
+            target_h = max(1, int(half * (0.15 + 0.85 * (1 - pe))))
+            nxt.draw(srcrect=(0, 0, r.w, half), dstrect=(r.x, r.y + half - target_h, r.w, target_h))
+        else:
+            # Bottom half unfolding from the hinge
+            target_h = max(1, int(half * (0.15 + 0.85 * pe)))
+            cur.draw(srcrect=(0, half, r.w, r.h - half), dstrect=(r.x, r.y + half, r.w, target_h))
+
+        renderer = self.renderer
+        renderer.draw_color = (0, 0, 0, profile.hinge_alpha(pe))
+        renderer.fill_rect((r.x, r.y + half - 1, r.w, 2))
+        self._draw_effects(flap, profile, p, phase)
+
+    def _draw_effects(self, flap, profile, p, phase):
+        r = flap.rect
+        renderer = self.renderer
+        if phase == "open":
+            if profile.reflection and 0.2 < p < 0.8:
+                renderer.draw_color = (255, 255, 255, int(80 * (1 - abs(0.5 - p) * 2)))
+                renderer.fill_rect((r.x, r.y + r.h // 2 - 2, r.w, 2))
+            elif profile.flicker and random.random() < 0.3:
+                renderer.draw_color = (255, 220, 180, random.randint(40, 90))
+                renderer.fill_rect((r.x, r.y + r.h // 2 - 1, r.w, 2))
+        gradient = self._gradient_texture(flap, profile) if flap.QUALITY.gradients else None
+        if gradient is not None:
+            gradient.draw(dstrect=r)
+        if profile.paper_shadow:
+            renderer.draw_color = (0, 0, 0, profile.paper_shadow)
+            renderer.fill_rect((r.x + 1, r.y + 1, r.w, r.h))
+
+    def _draw_panel(self, surf):
+        if self._panel is None or self._panel[0] is not surf:
+            self._panel = (surf, self._texture(surf, BLEND))
+        tex = self._panel[1]
+        tex.draw(dstrect=(0, self.size[1] - tex.height, tex.width, tex.height))
+
@@ -0,0 +1,162 @@
+import multiprocessing
+import os
+from multiprocessing import shared_memory
+
+import pygame
+
+from constants import *
+from quality import QUALITY_NAMES, QUALITY_TIERS
+
+
+class Tile:
+    """One band of rows, drawn by its own worker process into a shared pixel buffer."""
+
+    def __init__(self, rect, rows):
+        self.rect = rect  # screen area the buffer covers
+        self.rows = rows  # board row indices in this band
+        self.shm = shared_memory.SharedMemory(create=True, size=rect.w * rect.h * 4)
+        # Same byte order as the display surface; opaque, so compositing is a plain copy
+        self.surface = pygame.image.frombuffer(self.shm.buf, rect.size, "BGRA")
+        self.surface.set_alpha(None)
+        self.conn = None
+        self.process = None
+
+
+class TiledRenderer:
+    """
+    Splits the board into bands of rows, each drawn by a worker process into
+    a multiprocessing.shared_memory buffer. The main process keeps all flap
+    state; every frame it sends each worker only the flaps that changed in
+    its band, waits for the redrawn rects and blits them from surfaces that
+    view the shared buffers directly (pygame.image.frombuffer, no copy).
+    """
+
+    def __init__(self, rows, screen_size, font_path, font_size, budget_bytes, workers=None):
+        workers = max(1, min(workers or os.cpu_count() or 1, len(rows)))
+        # Children import pygame too; one banner is enough
+        os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+        ctx = multiprocessing.get_context("spawn")  # forking a process with a display open isn't safe
+        self.tiles = []
+        self._style = None
+        self._quality = None
+        for band in _split(len(rows), workers):
+            flaps = [f for r in band for f in rows[r].flaps]
+            # 1px margin for the paper style's offset shadow
+            rect = flaps[0].rect.unionall([f.rect for f in flaps]).inflate(2, 2).clip(pygame.Rect((0, 0), screen_size))
+            tile = Tile(rect, band)
+            # Flap rects relative to the tile, in the order deltas refer to them
+            local = [f.rect.move(-rect.x, -rect.y) for f in flaps]
+            tile.conn, child = ctx.Pipe()
+            tile.process = ctx.Process(
+                target=_worker, name=f"tile-{band[0]}",
+                args=(child, tile.shm.name, rect.size, [tuple(r) for r in local], flaps[0].v_offset,
+                      font_path, font_size, budget_bytes // workers),
+                daemon=True)
+            tile.process.start()
+            child.close()
+            self.tiles.append(tile)
+        for tile in self.tiles:
+            tile.conn.recv()  # ready
+
+    def draw(self, rows, surface, full=False):
+        """Have the workers redraw what changed, then composite it onto surface. Returns the screen rects."""
+        flap = rows[0].flaps[0]
+        style, quality = flap.STYLE, QUALITY_NAMES.index(flap.QUALITY.name)
+        settings = None
+        if (style, quality) != (self._style, self._quality):
+            settings = self._style, self._quality = style, quality
+            full = True
+
+        busy = []
+        for tile in self.tiles:
+            deltas = []
+            i = 0
+            for r in tile.rows:
+                for f in rows[r].flaps:
+                    if f.dirty or full:
+                        deltas.append((i, f.current, f.next_char, f.state, f.timer))
+                        f.dirty = False
+                    i += 1
+            if deltas or full:
+                tile.conn.send((settings, full, deltas))
+                busy.append(tile)
+
+        # All bands render in parallel; compositing waits for each in turn
+        rects = []
+        for tile in busy:
+            ox, oy = tile.rect.topleft
+            for x, y, w, h in tile.conn.recv():
+                surface.blit(tile.surface, (ox + x, oy + y), (x, y, w, h))
+                rects.append(pygame.Rect(ox + x, oy + y, w, h))
+        return rects
+
+    def close(self):
+        for tile in self.tiles:
+            try:
+                tile.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for tile in self.tiles:
+            tile.process.join(timeout=2)
+            tile.surface = None  # drop the view before releasing the buffer
+            tile.shm.close()
+            tile.shm.unlink()
+        self.tiles = []
+
+
+def _split(n, parts):
+    """n consecutive indices in parts bands, sizes differing by at most one."""
+    bands, start = [], 0
+    for i in range(parts):
+        end = start + (n - start) // (parts - i)
+        bands.append(list(range(start, end)))
+        start = end
+    return bands
+
+
+def _worker(conn, shm_name, size, flap_rects, v_offset, font_path, font_size, budget_bytes):
+    """Draws one tile's flaps into the shared buffer as the main process sends their changes."""
+    import main
+    from assets import ASSETS
+
+    pygame.font.init()
+    shm = shared_memory.SharedMemory(name=shm_name)
+    shared = pygame.image.frombuffer(shm.buf, size, "BGRA")
+    # Flaps are drawn on an opaque surface like the display: blend blits onto the
+    # shared buffer's alpha channel would change how later blits mix. Finished
+    # rects are copied across.
+    surface = pygame.Surface(size, 0, 32, (0xFF0000, 0xFF00, 0xFF, 0))
+    main.FLIP_SPRITES.budget_bytes = budget_bytes
+    font = ASSETS.font(font_path, font_size)
+    flaps = [main.SplitFlap(x, y, w, h, font, v_offset) for x, y, w, h in flap_rects]
+    conn.send(True)
+
+    while True:
+        message = conn.recv()
+        if message is None:
+            break
+        settings, full, deltas = message
+        if settings is not None:
+            main.SplitFlap.set_style(settings[0])
+            main.SplitFlap.set_quality(QUALITY_TIERS[settings[1]])
+        if full:
+            surface.fill(BG_COLOR)
+        rects = []
+        for i, current, next_char, state, timer in deltas:
+            f = flaps[i]
+            f.current, f.next_char, f.state, f.timer = current, next_char, state, timer
+            if full:
+                f.draw(surface)
+            else:
+                rect = f.rect.inflate(2, 2)
+                surface.fill(BG_COLOR, rect)
+                f.draw(surface)
+                rects.append(tuple(rect.clip(surface.get_rect())))
+        if full:
+            rects = [(0, 0) + size]
+        for rect in rects:
+            shared.blit(surface, rect[:2], rect)
+        conn.send(rects)
+
+    shared = None
+    shm.close()
@@ -0,0 +1,179 @@
+from constants import *
+
+_SPACE = CHAR_INDEX[' ']
+_NINE = CHAR_INDEX['9']
+_N_CHARS = len(CHARSET)
+GHOST_SLOWDOWN = 10.0
+
+
+class FlapSnapshot:
+    """What a flap looks like at one instant; the inputs and outputs of FlapTimeline."""
+
+    __slots__ = ("state", "current", "next", "timer", "close_time", "open_time", "force_cycles", "target")
+
+    def __init__(self, state, current, next, timer, close_time, open_time, force_cycles, target):
+        self.state = state
+        self.current = current
+        self.next = next
+        self.timer = timer
+        self.close_time = close_time
+        self.open_time = open_time
+        self.force_cycles = force_cycles
+        self.target = target
+
+    @classmethod
+    def idle(cls, current):
+        return cls('idle', current, current, 0.0, FLIP_CLOSE_TIME, FLIP_OPEN_TIME, 0, current)
+
+
+class FlapTimeline:
+    """
+    The complete schedule of one flap's flips, computed up front. Step k starts
+    at a known time and goes chars[k] -> chars[k + 1]: `close` seconds closing,
+    then `open` seconds opening. Only step 0 may have its own durations (a
+    ghost flip, or a step already in progress when the plan was made), so the
+    state at any time is a constant-time lookup.
+
+    A timeline can also hold the plan that is active until `switch_at`, for
+    targets that are queued with a cascade delay.
+    """
+
+    def __init__(self, t0, chars, first_close, first_open, target, force_cycles,
+                 prev=None, switch_at=None):
+        self.t0 = t0
+        self.chars = chars
+        self.first_close = first_close
+        self.first_open = first_open
+        self.close = FLIP_CLOSE_TIME
+        self.open = FLIP_OPEN_TIME
+        self.target = target
+        # force_cycles while each step runs; always 0 once the flap comes to rest
+        self.force_cycles = force_cycles
+        self.prev = prev
+        self.switch_at = switch_at
+        n = len(chars) - 1
+        self.steps = n
+        self.end = t0 if n == 0 else t0 + first_close + first_open + (n - 1) * (self.close + self.open)
+
+    # --- Planning ---
+
+    @classmethod
+    def plan(cls, at, snap, target, force_cycles, ghost=False):
+        """
+        Schedule everything a flap does from time `at`, given its state then and
+        a (new) target. Follows SplitFlap's flip rules: one CHARSET step at a
+        time, '9' heading to ' ' jumps straight to ' ', and force_cycles makes a
+        flap already showing its target go round the whole CHARSET.
+        """
+        if ghost:
+            # Same character, ten times slower
+            chars = [snap.current, snap.current]
+            return cls(at, chars, FLIP_CLOSE_TIME * GHOST_SLOWDOWN, FLIP_OPEN_TIME * GHOST_SLOWDOWN,
+                       target, [force_cycles])
+
+        force = force_cycles
+        if snap.state == 'closing':
+            t0 = at - snap.timer
+            chars = [snap.current, snap.next]
+            first_close, first_open = snap.close_time, snap.open_time
+        elif snap.state == 'opening':
+            t0 = at - snap.close_time - snap.timer
+            chars = [snap.current, snap.current]
+            first_close, first_open = snap.close_time, snap.open_time
+        elif force > 0 or snap.current != target:
+            t0 = at
+            chars = [snap.current]
+            first_close, first_open = FLIP_CLOSE_TIME, FLIP_OPEN_TIME
+            nxt, force = cls._advance(snap.current, target, force)
+            chars.append(nxt)
+        else:
+            return cls(at, [snap.current], FLIP_CLOSE_TIME, FLIP_OPEN_TIME, target, [])
+
+        forces = []
+        # Decide after each step whether to keep flipping; bounded by two full cycles
+        for _ in range(2 * _N_CHARS + 2):
+            cur = chars[-1]
+            forces.append(force)
+            if force > 0:
+                force -= 1
+                done = force == 0 and cur == target
+            else:
+                done = cur == target
+            if done:
+                break
+            nxt, force = cls._advance(cur, target, force)
+            chars.append(nxt)
+        return cls(t0, chars, first_close, first_open, target, forces)
+
+    @staticmethod
+    def _advance(cur, target, force):
+        if cur == _NINE and target == _SPACE:
+            return _SPACE, 0
+        return (cur + 1) % _N_CHARS, force
+
+    def active_at(self, t):
+        """The plan in effect at t, without any switch queued after it; None if nothing is planned by t."""
+        if self.prev is not None and t < self.switch_at:
+            return self.prev.active_at(t)
+        return self if t >= self.t0 else None
+
+    def then(self, switch_at, plan):
+        """A timeline that follows this one until switch_at and plan from then on."""
+        self.prev = None
+        plan.prev = self
+        plan.switch_at = switch_at
+        return plan
+
+    # --- Lookups ---
+
+    def _locate(self, t):
+        """(step, seconds into that step) at t, with step == steps once finished."""
+        if self.steps == 0 or t >= self.end:
+            return self.steps, 0.0
+        local = max(0.0, t - self.t0)
+        first = self.first_close + self.first_open
+        if local < first:
+            return 0, local
+        period = self.close + self.open
+        k = 1 + int((local - first) // period)
+        return k, local - first - (k - 1) * period
+
+    def at(self, t):
+        """FlapSnapshot at time t."""
+        if self.prev is not None and t < self.switch_at:
+            return self.prev.at(t)
+        if t < self.t0:
+            # Planned ahead of time: resting on the first character until then
+            cur = self.chars[0]
+            return FlapSnapshot('idle', cur, cur, 0.0, self.close, self.open, 0, cur)
+        k, local = self._locate(t)
+        if k >= self.steps:
+            cur = self.chars[-1]
+            return FlapSnapshot('idle', cur, cur, 0.0, self.close, self.open, 0, self.target)
+        close, open_ = (self.first_close, self.first_open) if k == 0 else (self.close, self.open)
+        force = self.force_cycles[k]
+        if local < close:
+            return FlapSnapshot('closing', self.chars[k], self.chars[k + 1], local, close, open_, force, self.target)
+        nxt = self.chars[k + 1]
+        return FlapSnapshot('opening', nxt, nxt, local - close, close, open_, force, self.target)
+
+    def events(self, t):
+        """Number of click-producing phase changes (flip starts and fold-downs) up to t."""
+        if self.prev is not None:
+            if t < self.switch_at:
+                return self.prev.events(t)
+            return self.prev.events(self.switch_at) + self._own_events(t) - self._own_events(self.switch_at)
+        return self._own_events(t)
+
+    def _own_events(self, t):
+        # A flip starting exactly at t clicks in the frame after t
+        if self.steps == 0 or t <= self.t0:
+            return 0
+        k, local = self._locate(t)
+        if k >= self.steps:
+            return 2 * self.steps
+        close = self.first_close if k == 0 else self.close
+        return 2 * k + (2 if local >= close else 1)
+
+    def finished(self, t):
+        return (self.prev is None or t >= self.switch_at) and t >= self.end
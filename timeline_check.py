@@ -0,0 +1,151 @@
+"""
+Checks the per-flap timeline engine against the frame-stepped BoardState.
+
+Both engines get the same random cascades, in some trials with a second
+flip_to queued while the first cascade is still running, and are stepped
+in small increments until they settle. The final text, the number of clicks
+and when each cell came to rest have to agree:
+
+    python timeline_check.py                   # exits 1 on any mismatch
+    python timeline_check.py --trials 200 --cols 44
+"""
+import os
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import random
+import sys
+
+import pygame
+
+from assets import ASSETS
+from audio import CLICK_MIXER
+from board_state import BoardState, IDLE
+from constants import *
+from main import FlapRow
+
+STEP = 0.0005        # seconds per step for both engines
+MAX_TIME = 60.0      # give up on a trial that hasn't settled by then
+FONT_PATH = "fonts/DINMittelschriftStd.otf"
+
+
+def random_text(rng, n_cols):
+    return "".join(rng.choice(CHARSET) for _ in range(n_cols))
+
+
+class Trial:
+    """One row driven through the same commands by both engines."""
+
+    def __init__(self, n_cols, font):
+        self.n_cols = n_cols
+        self.row = FlapRow(0, 0, n_cols, font)
+        self.board = BoardState(1, n_cols)
+        self.t = 0.0
+        self.clicks = [0, 0]                 # timeline, board
+        self.settled = [[0.0] * n_cols, [0.0] * n_cols]
+
+    def set_text(self, text):
+        self.row.set_text_immediate(text)
+        self.board.set_text_immediate(0, text)
+
+    def flip_to(self, text):
+        self.row.flip_to(text)
+        self.board.flip_to(0, text)
+
+    def queue_target(self, col, ch, delay):
+        self.row.flaps[col].queue_target(ch, delay)
+        self.board.flip_cells(0, [col], ch, cascade=False)
+        self.board.pending_delay[0, col] = delay
+
+    def run(self, seconds):
+        end = self.t + seconds
+        while self.t < end - STEP / 2:
+            self.step()
+
+    def run_until_settled(self):
+        while self.t < MAX_TIME and (self.row.is_busy() or self.board.row_busy(0)):
+            self.step()
+
+    def step(self):
+        CLICK_MIXER.pending = 0
+        self.row.update(STEP)
+        self.clicks[0] += CLICK_MIXER.pending
+        CLICK_MIXER.pending = 0
+        clicks, _changed = self.board.step(STEP)
+        self.clicks[1] += clicks
+        self.t += STEP
+        for col, f in enumerate(self.row.flaps):
+            if f.state != 'idle':
+                self.settled[0][col] = self.t
+            if self.board.phase[0, col] != IDLE:
+                self.settled[1][col] = self.t
+
+    def mismatches(self, tolerance):
+        problems = []
+        text, board_text = "".join(f.current for f in self.row.flaps), self.board.row_text(0)
+        if text != board_text:
+            problems.append(f"text {text!r} != {board_text!r}")
+        if self.clicks[0] != self.clicks[1]:
+            problems.append(f"clicks {self.clicks[0]} != {self.clicks[1]}")
+        worst = max(range(self.n_cols), key=lambda c: abs(self.settled[0][c] - self.settled[1][c]))
+        drift = self.settled[0][worst] - self.settled[1][worst]
+        if abs(drift) > tolerance:
+            problems.append(f"column {worst} settled at {self.settled[0][worst]:.3f}s "
+                            f"vs {self.settled[1][worst]:.3f}s")
+        return problems
+
+
+def requeue_single(font, tolerance):
+    """A delayed target replaced by another before its delay ran out."""
+    trial = Trial(1, font)
+    trial.set_text("A")
+    trial.queue_target(0, "C", 1.0)
+    trial.run(0.5)
+    trial.queue_target(0, "B", 1.0)
+    trial.run_until_settled()
+    return trial.mismatches(tolerance)
+
+
+def random_cascade(font, rng, n_cols, requeue, tolerance):
+    trial = Trial(n_cols, font)
+    trial.set_text(random_text(rng, n_cols))
+    trial.flip_to(random_text(rng, n_cols))
+    if requeue:
+        # Part way through the cascade, as when C is pressed or a refresh fires
+        trial.run(rng.uniform(0.0, n_cols * INTER_FLAP_DELAY + 1.0))
+        trial.flip_to(random_text(rng, n_cols))
+    trial.run_until_settled()
+    return trial.mismatches(tolerance)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--trials", type=int, default=40)
+    parser.add_argument("--cols", type=int, default=COLS)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--tolerance", type=float, default=0.001, help="allowed difference in settle time, seconds")
+    args = parser.parse_args()
+
+    pygame.font.init()
+    font = ASSETS.font(FONT_PATH, FONT_SIZE)
+    rng = random.Random(args.seed)
+    failures = 0
+
+    cases = [("requeue single flap", lambda: requeue_single(font, args.tolerance))]
+    for i in range(args.trials):
+        requeue = i % 2 == 1
+        name = f"cascade {i}{' requeued' if requeue else ''}"
+        cases.append((name, lambda requeue=requeue: random_cascade(font, rng, args.cols, requeue, args.tolerance)))
+
+    for name, check in cases:
+        problems = check()
+        if problems:
+            failures += 1
+            print(f"{name}: " + "; ".join(problems))
+    print(f"{len(cases) - failures}/{len(cases)} cases match")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,32 @@
 import datetime
+import json
+import os
+import queue
+import threading
+import time
 from zoneinfo import ZoneInfo
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
 
-import requests
+if TYPE_CHECKING:
+    import requests
+
+# Override to point the board at a local stub server instead of Open-Meteo
+OPEN_METEO_URL = os.environ.get("OPEN_METEO_URL", "https://api.open-meteo.com/v1/forecast")
+
+# Readings are persisted here so a restart or outage can still show recent data
+WEATHER_CACHE_PATH = os.environ.get(
+    "WEATHER_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "weather.json"),
+)
+# Seconds before cached readings count as stale; a location may override with "ttl"
+WEATHER_CACHE_TTL = 15 * 60
+
+# After this many consecutive failures an endpoint's circuit opens and calls fail fast
+BREAKER_FAILURE_THRESHOLD = 2
+BREAKER_BASE_BACKOFF = 10.0   # seconds the circuit stays open the first time
+BREAKER_MAX_BACKOFF = 600.0   # backoff doubles on every failed probe up to this
+# Seconds a failed location is answered from memory without touching the network
+NEGATIVE_CACHE_TTL = 30.0
 
 # Ordered list of locations to cycle through on the board
 WEATHER_LOCATIONS: List[Dict[str, str]] = [
@@ -74,55 +98,247 @@ MOCK_WEATHER_BOARDS: Dict[str, List[str]] = {
 }
 
 
-def _fetch_location_weather(location_key: str) -> Dict[str, Optional[float]]:
+# Shown while a prefetch for the location has not come back yet
+PENDING_READINGS: Dict[str, Optional[float]] = {
+    "temp_c": None,
+    "rain_prob": None,
+    "desc": "FETCHING LATEST DATA",
+}
+
+# Shown when the last fetch for the location failed and nothing is cached
+NO_DATA_READINGS: Dict[str, Optional[float]] = {"temp_c": None, "rain_prob": None, "desc": "NO DATA AVAILABLE"}
+
+
+def has_mock_board(location_key: str) -> bool:
+    return location_key.upper() in MOCK_WEATHER_BOARDS
+
+
+_session: Optional["requests.Session"] = None
+_session_lock = threading.Lock()
+
+
+def _get_session() -> "requests.Session":
+    """One pooled session for the whole process so connections are reused."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            # Imported on first use: requests and urllib3 take longer to import than the board takes to start
+            import requests
+            import requests.adapters
+            _session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=4)
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+        return _session
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling an endpoint whose circuit is open."""
+
+
+class CircuitBreaker:
     """
-    Query Open-Meteo for the given location.
-    Returns a dict with temp_c, rain_prob, desc.
+    Per-endpoint breaker. Closed: calls go through. Open: calls fail fast
+    until the backoff expires. Half-open: one probe call decides whether to
+    close again or re-open with twice the backoff.
     """
-    config = _LOCATION_MAP.get(location_key.upper())
-    if not config:
-        raise ValueError(f"Unknown weather location '{location_key}'")
 
-    url = (
-        "https://api.open-meteo.com/v1/forecast"
-        f"?latitude={config['latitude']}&longitude={config['longitude']}"
-        "&hourly=temperature_2m,precipitation_probability"
-        "&current_weather=true"
-        f"&timezone={config['timezone']}"
-    )
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        base_backoff: float = BREAKER_BASE_BACKOFF,
+        max_backoff: float = BREAKER_MAX_BACKOFF,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.state = self.CLOSED
+        self.failures = 0
+        self.backoff = 0.0
+        self.open_until = 0.0
+        self.last_error: Optional[str] = None
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() >= self.open_until:
+                # Let exactly one probe through
+                self.state = self.HALF_OPEN
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != self.CLOSED:
+                print(f"Weather circuit for {self.name} closed")
+            self.state = self.CLOSED
+            self.failures = 0
+            self.backoff = 0.0
+            self.last_error = None
+
+    def record_failure(self, exc: Exception) -> None:
+        with self._lock:
+            self.failures += 1
+            self.last_error = str(exc)
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.backoff:
+                    self.backoff = min(self.max_backoff, self.backoff * 2)
+                else:
+                    self.backoff = self.base_backoff
+                self.state = self.OPEN
+                self.open_until = time.monotonic() + self.backoff
+                print(f"Weather circuit for {self.name} open for {self.backoff:.0f}s "
+                      f"after {self.failures} failures: {exc}")
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "state": self.state,
+                "failures": self.failures,
+                "backoff": self.backoff,
+                "retry_in": max(0.0, self.open_until - time.monotonic()) if self.state == self.OPEN else 0.0,
+                "rejected": self.rejected,
+                "last_error": self.last_error,
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_negative_cache: Dict[str, float] = {}  # location key -> monotonic expiry
+_failure_lock = threading.Lock()
+
+
+def _breaker_for(url: str) -> CircuitBreaker:
+    with _failure_lock:
+        breaker = _breakers.get(url)
+        if breaker is None:
+            breaker = _breakers[url] = CircuitBreaker(url)
+        return breaker
+
+
+def _is_negatively_cached(location_key: str) -> bool:
+    with _failure_lock:
+        expiry = _negative_cache.get(location_key)
+        if expiry is None:
+            return False
+        if time.monotonic() >= expiry:
+            del _negative_cache[location_key]
+            return False
+        return True
+
+
+def weather_status() -> Dict:
+    """Breaker state per endpoint and seconds left on each negatively cached location."""
+    now = time.monotonic()
+    with _failure_lock:
+        breakers = list(_breakers.values())
+        negative = {key: round(expiry - now, 1) for key, expiry in _negative_cache.items() if expiry > now}
+    return {"breakers": {b.name: b.snapshot() for b in breakers}, "negative": negative}
+
+
+def _readings_from_response(data: Dict) -> Dict[str, Optional[float]]:
+    current = data.get("current_weather", {})
+    temp = current.get("temperature")
+    current_time = current.get("time")
+    rain_prob = None
+
+    hourly = data.get("hourly", {})
+    times = hourly.get("time", [])
+    probs = hourly.get("precipitation_probability", [])
+    if current_time and times and probs:
+        # current_weather can be on a 15 minute mark, hourly values are on the hour
+        hour = current_time[:13] + ":00"
+        try:
+            idx = times.index(hour)
+            rain_prob = probs[idx]
+        except ValueError:
+            pass
+
+    if rain_prob is None:
+        desc = "HAVE A GREAT DAY!"
+    elif rain_prob < 20:
+        desc = "CLEAR SKIES EXPECTED"
+    elif rain_prob < 50:
+        desc = "PARTLY CLOUDY CONDITIONS"
+    else:
+        desc = "SHOWERS LIKELY PACK UMB"
+
+    return {"temp_c": temp, "rain_prob": rain_prob, "desc": desc}
+
+
+def fetch_all_locations_weather(
+    location_keys: Optional[List[str]] = None,
+    base_url: Optional[str] = None,
+) -> Dict[str, Dict[str, Optional[float]]]:
+    """
+    Query Open-Meteo for several locations in a single request.
+    Returns {location_key: readings}; every key gets an entry even on failure.
+    """
+    keys = [k.upper() for k in (location_keys or [loc["key"] for loc in WEATHER_LOCATIONS])]
+    configs = []
+    for key in keys:
+        config = _LOCATION_MAP.get(key)
+        if not config:
+            raise ValueError(f"Unknown weather location '{key}'")
+        configs.append(config)
+
+    params = {
+        "latitude": ",".join(str(c["latitude"]) for c in configs),
+        "longitude": ",".join(str(c["longitude"]) for c in configs),
+        "current_weather": "true",
+        "hourly": "precipitation_probability",
+        "forecast_days": 1,
+        "timezone": "auto",
+    }
+
+    # Fail fast: recently failed locations and open circuits never reach the network
+    if all(_is_negatively_cached(key) for key in keys):
+        return {key: dict(NO_DATA_READINGS) for key in keys}
+    url = base_url or OPEN_METEO_URL
+    breaker = _breaker_for(url)
+    if not breaker.allow():
+        return {key: dict(NO_DATA_READINGS) for key in keys}
 
     try:
-        response = requests.get(url, timeout=5)
+        response = _get_session().get(url, params=params, timeout=5)
         response.raise_for_status()
         data = response.json()
-        current = data.get("current_weather", {})
-        temp = current.get("temperature")
-        current_time = current.get("time")
-        rain_prob = None
-
-        hourly = data.get("hourly", {})
-        times = hourly.get("time", [])
-        probs = hourly.get("precipitation_probability", [])
-        if current_time and times and probs:
-            try:
-                idx = times.index(current_time)
-                rain_prob = probs[idx]
-            except ValueError:
-                pass
-
-        if rain_prob is None:
-            desc = "HAVE A GREAT DAY!"
-        elif rain_prob < 20:
-            desc = "CLEAR SKIES EXPECTED"
-        elif rain_prob < 50:
-            desc = "PARTLY CLOUDY CONDITIONS"
-        else:
-            desc = "SHOWERS LIKELY PACK UMB"
-
-        return {"temp_c": temp, "rain_prob": rain_prob, "desc": desc}
+        # A single location comes back as an object, several as a list
+        results = data if isinstance(data, list) else [data]
+        if len(results) != len(keys):
+            raise ValueError(f"expected {len(keys)} locations, got {len(results)}")
+        readings = {key: _readings_from_response(result) for key, result in zip(keys, results)}
     except Exception as exc:
-        print(f"Weather fetch failed for {location_key}: {exc}")
-        return {"temp_c": None, "rain_prob": None, "desc": "NO DATA AVAILABLE"}
+        print(f"Weather fetch failed for {', '.join(keys)}: {exc}")
+        breaker.record_failure(exc)
+        expiry = time.monotonic() + NEGATIVE_CACHE_TTL
+        with _failure_lock:
+            for key in keys:
+                _negative_cache[key] = expiry
+        return {key: dict(NO_DATA_READINGS) for key in keys}
+
+    breaker.record_success()
+    with _failure_lock:
+        for key in keys:
+            _negative_cache.pop(key, None)
+    return readings
+
+
+def _fetch_location_weather(location_key: str, base_url: Optional[str] = None) -> Dict[str, Optional[float]]:
+    """
+    Query Open-Meteo for the given location.
+    Returns a dict with temp_c, rain_prob, desc.
+    """
+    return fetch_all_locations_weather([location_key], base_url)[location_key.upper()]
 
 
 def _fit(text: str, width: int = 22) -> str:
@@ -133,9 +349,14 @@ def _fit(text: str, width: int = 22) -> str:
     return text.ljust(width)
 
 
-def fetch_weather_update(location_key: str, use_mock: bool = False) -> List[str]:
+def fetch_weather_update(
+    location_key: str,
+    use_mock: bool = False,
+    readings: Optional[Dict[str, Optional[float]]] = None,
+) -> List[str]:
     """
     Return 6 board lines (<=22 chars each) for the requested location.
+    Pass already fetched readings to build the lines without touching the network.
     """
     if not _LOCATION_MAP:
         raise RuntimeError("No weather locations configured.")
@@ -149,10 +370,9 @@ def fetch_weather_update(location_key: str, use_mock: bool = False) -> List[str]
         if mock_board:
             return [_fit(line) for line in mock_board]
 
-    readings = _fetch_location_weather(location_key)
-    tz = ZoneInfo(location["timezone"])
-    now = datetime.datetime.now(tz)
-
+    if readings is None:
+        readings = _fetch_location_weather(location_key)
+    now = local_time(location_key)
 
     time_line = now.strftime("%I:%M %p")
     if time_line.startswith("0"):
@@ -169,3 +389,165 @@ def fetch_weather_update(location_key: str, use_mock: bool = False) -> List[str]
         _fit(f"RAIN" + 4*" " + f"{rain_line.rjust(6)}"),
         _fit(desc_line),
     ]
+
+
+def local_time(location_key):
+    """The wall-clock time now at a configured location."""
+    location = _LOCATION_MAP[location_key.upper()]
+    return datetime.datetime.now(ZoneInfo(location["timezone"]))
+
+
+class WeatherCache:
+    """
+    Readings keyed by location, optionally persisted to a JSON file.
+    Entries never expire on their own; callers decide what to do with stale ones.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: Optional[str] = WEATHER_CACHE_PATH):
+        self.path = path
+        self._entries: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError) as exc:
+            print(f"Ignoring unreadable weather cache {self.path}: {exc}")
+            return
+        if data.get("version") != self.VERSION:
+            return
+        with self._lock:
+            self._entries = dict(data.get("locations", {}))
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        with self._lock:
+            data = {"version": self.VERSION, "locations": dict(self._entries)}
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as fh:
+                json.dump(data, fh)
+            os.replace(tmp_path, self.path)
+        except OSError as exc:
+            print(f"Could not write weather cache {self.path}: {exc}")
+
+    def get(self, location_key: str) -> Optional[Dict[str, Optional[float]]]:
+        with self._lock:
+            entry = self._entries.get(location_key.upper())
+        return dict(entry["readings"]) if entry else None
+
+    def age(self, location_key: str) -> Optional[float]:
+        with self._lock:
+            entry = self._entries.get(location_key.upper())
+        return time.time() - entry["fetched_at"] if entry else None
+
+    def is_fresh(self, location_key: str) -> bool:
+        age = self.age(location_key)
+        return age is not None and age < location_ttl(location_key)
+
+    def put(self, location_key: str, readings: Dict[str, Optional[float]], fetched_at: Optional[float] = None) -> None:
+        with self._lock:
+            self._entries[location_key.upper()] = {
+                "readings": dict(readings),
+                "fetched_at": time.time() if fetched_at is None else fetched_at,
+            }
+
+
+def location_ttl(location_key: str) -> float:
+    config = _LOCATION_MAP.get(location_key.upper(), {})
+    return float(config.get("ttl", WEATHER_CACHE_TTL))
+
+
+def _is_failed_reading(readings: Dict[str, Optional[float]]) -> bool:
+    return readings.get("desc") == NO_DATA_READINGS["desc"]
+
+
+class WeatherPrefetcher:
+    """
+    Fetches location readings on a background thread so the render loop
+    never waits on the network. Every location is fetched in one batched
+    request and stored in a WeatherCache. Cached readings are served right
+    away, even when stale, while a refresh runs in the background.
+    """
+
+    def __init__(
+        self,
+        fetch: Optional[Callable[[List[str]], Dict[str, Dict[str, Optional[float]]]]] = None,
+        location_keys: Optional[List[str]] = None,
+        cache: Optional[WeatherCache] = None,
+        start: bool = True,
+    ):
+        self._fetch = fetch or fetch_all_locations_weather
+        self._location_keys = location_keys or [loc["key"] for loc in WEATHER_LOCATIONS]
+        self.cache = cache if cache is not None else WeatherCache()
+        self._requests: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._in_flight = set()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="weather-prefetch", daemon=True)
+        if start:
+            self.start()
+
+    def start(self) -> None:
+        """Start fetching; requests made before this wait in the queue."""
+        if self._thread.ident is None:
+            self._thread.start()
+
+    def request(self, location_key: str) -> None:
+        """Queue a refresh for the location unless it is fresh or already being fetched."""
+        key = location_key.upper()
+        if self.cache.is_fresh(key):
+            return
+        with self._lock:
+            if key in self._in_flight:
+                return
+            self._in_flight.add(key)
+        self._requests.put(key)
+
+    def get(self, location_key: str) -> Optional[Dict[str, Optional[float]]]:
+        """
+        Return cached readings for a location without blocking, or None if it
+        has never been fetched. Stale or missing entries trigger a background refresh.
+        """
+        readings = self.cache.get(location_key)
+        self.request(location_key)
+        return readings
+
+    def is_pending(self, location_key: str) -> bool:
+        with self._lock:
+            return location_key.upper() in self._in_flight
+
+    def stop(self) -> None:
+        self._requests.put(None)
+
+    def _run(self) -> None:
+        while True:
+            key = self._requests.get()
+            if key is None:
+                return
+            if self.cache.is_fresh(key):
+                # Already refreshed by an earlier batch
+                with self._lock:
+                    self._in_flight.discard(key)
+                continue
+            keys = list(dict.fromkeys(self._location_keys + [key]))
+            try:
+                batch = self._fetch(keys)
+            except Exception as exc:
+                print(f"Weather prefetch failed for {key}: {exc}")
+                batch = {}
+            fetched_at = time.time()
+            for batch_key, readings in batch.items():
+                # Keep the last good readings rather than overwrite them with a failure
+                if not _is_failed_reading(readings):
+                    self.cache.put(batch_key, readings, fetched_at)
+            self.cache.save()
+            with self._lock:
+                self._in_flight.discard(key)